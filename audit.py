@@ -0,0 +1,293 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+
+INDEX_VERSION = 1
+INDEX_FILE = "index.json"
+
+SEGMENT = re.compile(r"audit-(\d+)\.jsonl(\.gz)?$")
+
+def segment_name(number, compressed=False):
+    return f"audit-{number:06d}.jsonl" + (".gz" if compressed else "")
+
+class SegmentIndex:
+    # What one segment holds: time range and per-guild, per-user record
+    # counts. Enough to skip whole segments when paging through history.
+    __slots__ = ("number", "first", "last", "count", "guilds")
+
+    def __init__(self, number, first=None, last=None, count=0, guilds=None):
+        self.number = number
+        self.first = first
+        self.last = last
+        self.count = count
+        self.guilds = guilds or {}
+
+    def add(self, record):
+        if self.first is None:
+            self.first = record["ts"]
+        self.last = record["ts"]
+        self.count += 1
+        users = self.guilds.setdefault(record["guild"], {})
+        users[record["user"]] = users.get(record["user"], 0) + 1
+
+    def matches(self, guild_id, user_id=None):
+        users = self.guilds.get(guild_id)
+        if not users:
+            return 0
+        return users.get(user_id, 0) if user_id is not None else sum(users.values())
+
+    def to_dict(self):
+        return {
+            "number": self.number, "first": self.first, "last": self.last, "count": self.count,
+            "guilds": {str(guild_id): {str(user_id): n for user_id, n in users.items()} for guild_id, users in self.guilds.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        guilds = {int(guild_id): {int(user_id): n for user_id, n in users.items()} for guild_id, users in data["guilds"].items()}
+        return cls(data["number"], data["first"], data["last"], data["count"], guilds)
+
+class AuditLog:
+    # Who ran what, when, and how it went. Command handlers only put a dict
+    # on a queue; a background task drains it in batches and appends JSON
+    # lines to the open segment from a worker thread. Full segments are
+    # gzipped and described in index.json, and only the newest
+    # `keep_segments` are kept. The open segment stays decoded in memory,
+    # so paging through recent history never touches the disk.
+    def __init__(self, directory, segment_bytes=1024 * 1024, keep_segments=50, flush_delay=1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.keep_segments = keep_segments
+        self.flush_delay = flush_delay
+        self.segments = []
+        self.current = None
+        self.records = []
+        self.size = 0
+        self.writes = 0
+        self._queue = asyncio.Queue()
+        self._pending = []
+        self._task = None
+        self._loaded = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def record(self, record):
+        # The whole cost on the command path
+        self._queue.put_nowait(record)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _ensure_loaded(self):
+        if self._loaded is None:
+            self._loaded = asyncio.ensure_future(asyncio.get_running_loop().run_in_executor(None, self._load))
+        await self._loaded
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self._path(INDEX_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            segments = [SegmentIndex.from_dict(entry) for entry in data["segments"]]
+        except (IOError, ValueError, KeyError):
+            segments = None
+
+        plain, sealed = set(), set()
+        for name in os.listdir(self.directory):
+            match = SEGMENT.match(name)
+            if match:
+                (sealed if match.group(2) else plain).add(int(match.group(1)))
+        for number in plain & sealed:
+            # Crashed after compressing; the .gz is complete
+            os.remove(self._path(segment_name(number)))
+        plain -= sealed
+        if segments is None or {s.number for s in segments} != sealed:
+            # Index lost or out of step with the files: rebuild it from the segments
+            segments = [self._scan(n) for n in sorted(sealed)]
+            self._write_index(segments)
+
+        number = max(plain) if plain else max(sealed, default=0) + 1
+        current = SegmentIndex(number)
+        records = self._read(number)
+        for record in records:
+            current.add(record)
+        path = self._path(segment_name(number))
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size:
+            with open(path, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line cut short by a crash before appending
+                    f.write(b"\n")
+                    size += 1
+        self.segments = segments
+        self.current = current
+        self.records = records
+        self.size = size
+
+    def _read(self, number):
+        records = []
+        for name, opener in ((segment_name(number, True), gzip.open), (segment_name(number), open)):
+            path = self._path(name)
+            if not os.path.exists(path):
+                continue
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash
+                        continue
+            break
+        return records
+
+    def _scan(self, number):
+        index = SegmentIndex(number)
+        for record in self._read(number):
+            index.add(record)
+        return index
+
+    def _write_index(self, segments):
+        path = self._path(INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "segments": [s.to_dict() for s in segments]}, f)
+        os.replace(path + ".tmp", path)
+
+    def _append(self, number, lines):
+        with open(self._path(segment_name(number)), "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+        self.writes += 1
+
+    def _seal(self, number, segments, expired):
+        # Compress the full segment, then publish it in the index before the
+        # plain file goes, so a crash never loses a segment
+        plain = self._path(segment_name(number))
+        with open(plain, "rb") as src, gzip.open(plain + ".gz.tmp", "wb") as dst:
+            dst.writelines(src)
+        os.replace(plain + ".gz.tmp", plain + ".gz")
+        self._write_index(segments)
+        os.remove(plain)
+        for old in expired:
+            try:
+                os.remove(self._path(segment_name(old.number, True)))
+            except OSError:
+                pass
+
+    async def _run(self):
+        await self._ensure_loaded()
+        while True:
+            self._pending.append(await self._queue.get())
+            # Let a burst of commands pile up into one write
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self._flush()
+            except Exception as e:
+                # One bad batch must not stop the writer and leave the queue growing
+                print(f"Could not write audit log: {e!r}")
+
+    async def _flush(self):
+        while not self._queue.empty():
+            self._pending.append(self._queue.get_nowait())
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        loop = asyncio.get_running_loop()
+        batch, lines = [], []
+        for record in pending:
+            try:
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                self.current.add(record)
+            except (TypeError, ValueError, KeyError) as e:
+                print(f"Dropping audit record {record.get('command')!r}: {e}")
+                continue
+            batch.append(record)
+            lines.append(line)
+        if not batch:
+            return
+        lines = "".join(lines)
+        self.records.extend(batch)
+        write = loop.run_in_executor(None, self._append, self.current.number, lines)
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # Never leave a write running behind the final flush in close()
+            await write
+            raise
+        except OSError as e:
+            print(f"Could not write audit log: {e}")
+            return
+        self.size += len(lines.encode("utf-8"))
+        if self.size < self.segment_bytes:
+            return
+
+        sealed = self.current
+        self.segments.append(sealed)
+        expired = self.segments[:-self.keep_segments] if len(self.segments) > self.keep_segments else []
+        self.segments = self.segments[len(expired):]
+        self.current = SegmentIndex(sealed.number + 1)
+        self.records = []
+        self.size = 0
+        seal = loop.run_in_executor(None, self._seal, sealed.number, list(self.segments), expired)
+        try:
+            await asyncio.shield(seal)
+        except asyncio.CancelledError:
+            await seal
+            raise
+        except OSError as e:
+            print(f"Could not rotate audit log: {e}")
+
+    async def history(self, guild_id, user_id=None, offset=0, limit=10):
+        # Newest first. The index says how many matches each sealed segment
+        # holds, so segments before the requested page are skipped unread.
+        await self._ensure_loaded()
+        page = []
+
+        def take(records):
+            nonlocal offset
+            for record in reversed(records):
+                if record["guild"] != guild_id or (user_id is not None and record["user"] != user_id):
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                page.append(record)
+                if len(page) >= limit:
+                    return True
+            return False
+
+        if take(self.records):
+            return page
+        loop = asyncio.get_running_loop()
+        for segment in reversed(self.segments):
+            matches = segment.matches(guild_id, user_id)
+            if matches <= offset:
+                offset -= matches
+                continue
+            try:
+                records = await loop.run_in_executor(None, self._read, segment.number)
+            except (OSError, EOFError) as e:
+                print(f"Could not read audit segment {segment.number}: {e}")
+                continue
+            if take(records):
+                break
+        return page
+
+    def count(self, guild_id, user_id=None):
+        # Written records only; anything still queued shows up after the next flush
+        if self.current is None:
+            return 0
+        return self.current.matches(guild_id, user_id) + sum(segment.matches(guild_id, user_id) for segment in self.segments)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._pending or not self._queue.empty():
+            await self._ensure_loaded()
+            await self._flush()
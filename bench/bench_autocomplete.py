@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obs_state import SceneModel
+from scene_index import SceneIndex
+
+WORDS = [
+    "Main", "Gameplay", "Intro", "Outro", "BRB", "Starting", "Ending", "Just Chatting", "Camera",
+    "Facecam", "Fullscreen", "Overlay", "Alerts", "Sponsor", "Break", "Interview", "Guest", "Podcast",
+    "Desktop", "Console", "Replay", "Highlights", "Lobby", "Stage", "Backstage", "Wide", "Close-up",
+    "Tournament", "Bracket", "Scoreboard", "Caster", "Analyst", "Crowd", "Drone", "Map", "Studio",
+]
+
+def make_scenes(count, seed):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        parts = rng.sample(WORDS, rng.randint(1, 3))
+        names.add(f"{' - '.join(parts)} {rng.randint(1, 99)}")
+    return sorted(names, key=lambda _: rng.random())
+
+def typo(text, rng):
+    if len(text) < 4:
+        return text
+    i = rng.randrange(len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+def make_queries(scenes, count, seed):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(scenes)
+        kind = rng.random()
+        if kind < 0.5:
+            queries.append(name[:rng.randint(1, 10)])
+        elif kind < 0.8:
+            start = rng.randrange(len(name))
+            queries.append(name[start:start + rng.randint(2, 8)])
+        else:
+            queries.append(typo(name[:rng.randint(5, 12)], rng))
+    return queries
+
+def measure(index, queries, cold):
+    samples = []
+    for i, query in enumerate(queries):
+        if cold:
+            index._cache.clear()
+        start = time.perf_counter_ns()
+        index.search(query, user_id=i % 20)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[int(len(samples) * 0.99)],
+        "max": samples[-1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scene autocomplete lookups")
+    parser.add_argument("--scenes", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    scenes = make_scenes(args.scenes, args.seed)
+    model = SceneModel()
+    model.load({"scenes": [{"sceneName": name} for name in scenes]})
+    index = SceneIndex(model)
+
+    start = time.perf_counter()
+    index.search("")
+    print(f"Index build for {len(scenes)} scenes: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    for user_id in range(20):
+        for name in rng.sample(scenes, 5):
+            index.record_use(user_id, name)
+
+    queries = make_queries(scenes, args.queries, args.seed)
+    # Repeated keystrokes within one cache's worth of distinct queries
+    hot = queries[:index.cache_size] * (args.queries // index.cache_size)
+    measure(index, hot, cold=False)
+    for label, batch, cold in (("uncached", queries, True), ("cached", hot, False)):
+        stats = measure(index, batch, cold)
+        print(f"{label:>9}: mean {stats['mean']:.1f} us  p50 {stats['p50']:.1f} us  "
+              f"p99 {stats['p99']:.1f} us  max {stats['max']:.1f} us")
+
+if __name__ == "__main__":
+    main()
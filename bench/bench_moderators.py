@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moderators import ModeratorStore
+
+def legacy_save(path, moderators):
+    # What /addmod used to do: rewrite the whole .env on the event loop
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("DISCORD_TOKEN=token\nOBS_PASSWORD=password\n")
+        f.write("MODERATORS=" + ",".join(f"{mod_id}:{name}" for mod_id, name in moderators.items()) + "\n")
+
+async def run(count, directory):
+    legacy_path = os.path.join(directory, ".env")
+    moderators = {}
+    start = time.perf_counter()
+    for i in range(count):
+        moderators[i] = f"Moderator {i}"
+        legacy_save(legacy_path, moderators)
+    legacy = time.perf_counter() - start
+
+    store = ModeratorStore(os.path.join(directory, ".moderators"), flush_delay=0.05)
+    start = time.perf_counter()
+    for i in range(count):
+        store.add_user(1, i, f"Moderator {i}")
+    mutations = time.perf_counter() - start
+    await store.close()
+    total = time.perf_counter() - start
+
+    print(f"{count} /addmod mutations")
+    print(f"  legacy .env rewrite : {legacy * 1000:8.2f} ms on loop, {count} writes, {count / legacy:,.0f} ops/s")
+    print(f"  ModeratorStore      : {mutations * 1000:8.2f} ms on loop, {store.writes} write(s), {count / mutations:,.0f} ops/s")
+    print(f"  store incl. flush   : {total * 1000:8.2f} ms")
+
+    reloaded = ModeratorStore(store.path)
+    reloaded.load()
+    assert reloaded.acl(1).users == store.acl(1).users
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark moderator mutation throughput")
+    parser.add_argument("--count", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(args.count, directory))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each probe runs in a fresh interpreter and reports wall time for its imports
+# (plus building the bot where that needs no display) and peak RSS in KiB.
+PROBES = {
+    "headless": (
+        "from bot import create_bot\n"
+        "from config import Config\n"
+        "from secret_manager import SecretManager\n"
+        "bot = create_bot(Config(), SecretManager())\n"
+    ),
+    "gui": (
+        "import gui\n"
+        "from config import Config\n"
+        "from secret_manager import SecretManager\n"
+        "bot = gui.create_bot(Config(), SecretManager())\n"
+    ),
+}
+
+RUNNER = (
+    "import time, resource, sys\n"
+    "start = time.perf_counter()\n"
+    "exec(sys.argv[1])\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+def probe(code):
+    out = subprocess.run([sys.executable, "-c", RUNNER, code], cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed, rss = out.stdout.split()[-2:]
+    return float(elapsed), int(rss)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare startup import time and memory of headless and GUI modes")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for mode, code in PROBES.items():
+        try:
+            samples = [probe(code) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{mode:>9}: failed to start ({e.stderr.strip().splitlines()[-1]})")
+            continue
+        times = [t for t, _ in samples]
+        rss = [r for _, r in samples]
+        print(f"{mode:>9}: startup {statistics.median(times) * 1000:6.0f} ms (median of {args.runs}), "
+              f"peak RSS {statistics.median(rss) / 1024:5.1f} MiB")
+
+if __name__ == "__main__":
+    main()
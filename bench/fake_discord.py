@@ -0,0 +1,83 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+# Minimal stand-ins for discord.Interaction so app-command callbacks can be
+# driven directly, without a gateway connection or a real guild.
+
+class FakeResponse:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = []
+        self.acked_at = None
+        self.delivered = asyncio.Event()
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _ack(self, kind, content, kwargs):
+        if self._done:
+            raise RuntimeError("Interaction has already been responded to")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._done = True
+        self.acked_at = time.perf_counter()
+        self.messages.append((kind, content, kwargs))
+
+    async def send_message(self, content=None, **kwargs):
+        await self._ack("message", content, kwargs)
+        self.delivered.set()
+
+    async def defer(self, **kwargs):
+        await self._ack("defer", None, kwargs)
+
+class FakeFollowup:
+    def __init__(self, response):
+        self.response = response
+
+    async def send(self, content=None, **kwargs):
+        if self.response.latency:
+            await asyncio.sleep(self.response.latency)
+        self.response.messages.append(("followup", content, kwargs))
+        self.response.delivered.set()
+
+class FakeInteraction:
+    def __init__(self, user_id, guild_id=1, owner_id=None, roles=(), namespace=None, latency=0.0):
+        self.id = time.perf_counter_ns()
+        self.user = SimpleNamespace(id=user_id, display_name=f"User {user_id}", mention=f"<@{user_id}>",
+                                    roles=[SimpleNamespace(id=role_id) for role_id in roles])
+        self.guild = SimpleNamespace(id=guild_id, owner_id=user_id if owner_id is None else owner_id)
+        self.guild_id = guild_id
+        self.namespace = SimpleNamespace(**(namespace or {}))
+        self.response = FakeResponse(latency)
+        self.followup = FakeFollowup(self.response)
+        self.created = time.perf_counter()
+
+    async def edit_original_response(self, content=None, **kwargs):
+        if self.response.latency:
+            await asyncio.sleep(self.response.latency)
+        self.response.messages.append(("edit", content, kwargs))
+        self.response.delivered.set()
+
+    async def delete_original_response(self):
+        if self.response.latency:
+            await asyncio.sleep(self.response.latency)
+        self.response.messages.append(("delete", None, {}))
+
+    @property
+    def outcome(self):
+        return self.response.messages[-1] if self.response.messages else None
+
+async def invoke(bot, command_name, interaction, wait=True, **params):
+    # Deferred commands finish in the background; wait for their final message
+    command = bot.tree.get_command(command_name)
+    interaction.namespace = SimpleNamespace(**params)
+    await command.callback(interaction, **params)
+    if wait:
+        await interaction.response.delivered.wait()
+    return interaction
+
+async def autocomplete(bot, name, param, interaction, current):
+    command = bot.tree.get_command(name)
+    return await command._params[param].autocomplete(interaction, current)
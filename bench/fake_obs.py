@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import secrets
+import struct
+import sys
+import zlib
+
+from aiohttp import web, WSMsgType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obs_session import build_auth, OP_HELLO, OP_IDENTIFY, OP_IDENTIFIED, OP_EVENT, OP_REQUEST, OP_REQUEST_RESPONSE, \
+    OP_REQUEST_BATCH, OP_REQUEST_BATCH_RESPONSE, EVENT_SCENES, EVENT_OUTPUTS, EVENT_SCENE_ITEMS
+
+# Status codes from the OBS WebSocket v5 protocol
+STATUS_SUCCESS = 100
+STATUS_UNKNOWN_REQUEST = 204
+STATUS_OUTPUT_RUNNING = 500
+STATUS_OUTPUT_NOT_RUNNING = 501
+STATUS_RESOURCE_NOT_FOUND = 600
+
+# Sources every generated scene starts with, bottom to top
+DEFAULT_SOURCES = ("Background", "Camera", "Overlay", "Alerts")
+
+def solid_png(width, height, rgb):
+    # A single-colour PNG without any imaging library
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    row = b"\x00" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height)) + chunk(b"IEND", b""))
+
+class FakeObsServer:
+    # Stand-in OBS WebSocket v5 server for benchmarks. Every request waits
+    # `latency` seconds before it is answered, so concurrency shows up the
+    # same way it does against a busy OBS.
+    def __init__(self, host="127.0.0.1", port=4455, password="", latency=0.0, scenes=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.scenes = list(scenes or ["Main", "BRB", "Gameplay", "Just Chatting", "Ending"])
+        self.current_scene = self.scenes[0]
+        self.scene_items = {scene: [{"sceneItemId": i + 1, "sourceName": source, "sceneItemEnabled": True, "sceneItemIndex": i}
+                                    for i, source in enumerate(DEFAULT_SOURCES)] for scene in self.scenes}
+        self.streaming = False
+        self.recording = False
+        self.stream_bytes = 0
+        self.frames = 0
+        self.requests = 0
+        self.connections = 0
+        self._clients = {}
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self):
+        for ws in list(self._clients):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse(protocols=("obswebsocket.json",), max_msg_size=0)
+        await ws.prepare(request)
+        self.connections += 1
+
+        hello = {"obsWebSocketVersion": "5.0.0", "rpcVersion": 1}
+        salt, challenge = secrets.token_urlsafe(16), secrets.token_urlsafe(16)
+        if self.password:
+            hello["authentication"] = {"salt": salt, "challenge": challenge}
+        await ws.send_json({"op": OP_HELLO, "d": hello})
+
+        identify = await ws.receive_json()
+        if identify.get("op") != OP_IDENTIFY:
+            await ws.close(code=4007)
+            return ws
+        if self.password and identify["d"].get("authentication") != build_auth(self.password, salt, challenge):
+            await ws.close(code=4009)
+            return ws
+        await ws.send_json({"op": OP_IDENTIFIED, "d": {"negotiatedRpcVersion": 1}})
+        self._clients[ws] = identify["d"].get("eventSubscriptions", 0)
+
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                asyncio.ensure_future(self._answer(ws, payload["op"], payload["d"]))
+        finally:
+            self._clients.pop(ws, None)
+        return ws
+
+    async def _answer(self, ws, op, data):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if op == OP_REQUEST:
+            response = self._run(data["requestType"], data.get("requestData") or {})
+            response["requestId"] = data["requestId"]
+            await self._send(ws, {"op": OP_REQUEST_RESPONSE, "d": response})
+        elif op == OP_REQUEST_BATCH:
+            results = []
+            for item in data.get("requests", []):
+                result = self._run(item["requestType"], item.get("requestData") or {})
+                results.append(result)
+                if data.get("haltOnFailure") and not result["requestStatus"]["result"]:
+                    break
+            await self._send(ws, {"op": OP_REQUEST_BATCH_RESPONSE, "d": {"requestId": data["requestId"], "results": results}})
+
+    async def _send(self, ws, payload):
+        if not ws.closed:
+            await ws.send_json(payload)
+
+    def _run(self, request_type, data):
+        self.requests += 1
+        handler = getattr(self, "_req_" + request_type, None)
+        if handler is None:
+            return self._status(request_type, STATUS_UNKNOWN_REQUEST, "Unknown request type")
+        code, response_data = handler(data)
+        result = self._status(request_type, code)
+        if response_data:
+            result["responseData"] = response_data
+        return result
+
+    def _status(self, request_type, code, comment=None):
+        status = {"result": code == STATUS_SUCCESS, "code": code}
+        if comment:
+            status["comment"] = comment
+        return {"requestType": request_type, "requestStatus": status}
+
+    def emit(self, event_type, event_data, intent):
+        for ws, subscriptions in list(self._clients.items()):
+            if subscriptions & intent:
+                asyncio.ensure_future(self._send(ws, {"op": OP_EVENT, "d": {"eventType": event_type, "eventIntent": intent, "eventData": event_data}}))
+
+    def _req_GetVersion(self, data):
+        return STATUS_SUCCESS, {"obsVersion": "30.0.0", "obsWebSocketVersion": "5.0.0", "rpcVersion": 1}
+
+    def _req_GetSceneList(self, data):
+        scenes = [{"sceneName": name, "sceneIndex": i} for i, name in enumerate(self.scenes)]
+        return STATUS_SUCCESS, {"currentProgramSceneName": self.current_scene, "scenes": scenes}
+
+    def _req_SetCurrentProgramScene(self, data):
+        if data.get("sceneName") not in self.scenes:
+            return STATUS_RESOURCE_NOT_FOUND, None
+        self.current_scene = data["sceneName"]
+        self.emit("CurrentProgramSceneChanged", {"sceneName": self.current_scene}, EVENT_SCENES)
+        return STATUS_SUCCESS, None
+
+    def _req_GetSourceScreenshot(self, data):
+        if data.get("sourceName") not in self.scenes:
+            return STATUS_RESOURCE_NOT_FOUND, None
+        width = int(data.get("imageWidth", 1920))
+        height = int(data.get("imageHeight", width * 9 // 16))
+        rgb = zlib.crc32(data["sourceName"].encode()).to_bytes(4, "big")[:3]
+        image = base64.b64encode(solid_png(width, height, rgb)).decode()
+        return STATUS_SUCCESS, {"imageData": f"data:image/{data.get('imageFormat', 'png')};base64,{image}"}
+
+    def add_scene_item(self, scene, source):
+        items = self.scene_items[scene]
+        item = {"sceneItemId": max((i["sceneItemId"] for i in items), default=0) + 1, "sourceName": source,
+                "sceneItemEnabled": True, "sceneItemIndex": len(items)}
+        items.append(item)
+        self.emit("SceneItemCreated", {"sceneName": scene, "sourceName": source, "sceneItemId": item["sceneItemId"],
+                                       "sceneItemIndex": item["sceneItemIndex"]}, EVENT_SCENE_ITEMS)
+        return item
+
+    def _req_GetSceneItemList(self, data):
+        if data.get("sceneName") not in self.scene_items:
+            return STATUS_RESOURCE_NOT_FOUND, None
+        return STATUS_SUCCESS, {"sceneItems": [dict(item) for item in self.scene_items[data["sceneName"]]]}
+
+    def _req_SetSceneItemEnabled(self, data):
+        items = {item["sceneItemId"]: item for item in self.scene_items.get(data.get("sceneName"), [])}
+        item = items.get(data.get("sceneItemId"))
+        if item is None:
+            return STATUS_RESOURCE_NOT_FOUND, None
+        item["sceneItemEnabled"] = bool(data["sceneItemEnabled"])
+        self.emit("SceneItemEnableStateChanged", {"sceneName": data["sceneName"], "sceneItemId": item["sceneItemId"],
+                                                  "sceneItemEnabled": item["sceneItemEnabled"]}, EVENT_SCENE_ITEMS)
+        return STATUS_SUCCESS, None
+
+    def _req_GetStreamStatus(self, data):
+        # Pretend to push 6000 kbps while live
+        self.stream_bytes += 750_000 if self.streaming else 0
+        return STATUS_SUCCESS, {"outputActive": self.streaming, "outputReconnecting": False,
+                                "outputBytes": self.stream_bytes, "outputCongestion": 0.0}
+
+    def _req_GetStats(self, data):
+        self.frames += 60
+        return STATUS_SUCCESS, {"cpuUsage": 4.2, "memoryUsage": 512.0, "activeFps": 60.0, "averageFrameRenderTime": 1.8,
+                                "renderSkippedFrames": self.frames // 500, "renderTotalFrames": self.frames,
+                                "outputSkippedFrames": 0, "outputTotalFrames": self.frames}
+
+    def _transition(self, event_type, active):
+        # Outputs pass through STARTING/STOPPING before settling, like OBS
+        step, done = ("STARTING", "STARTED") if active else ("STOPPING", "STOPPED")
+        self.emit(event_type, {"outputActive": not active, "outputState": f"OBS_WEBSOCKET_OUTPUT_{step}"}, EVENT_OUTPUTS)
+        asyncio.get_running_loop().call_later(self.latency or 0.01, self.emit, event_type,
+                                              {"outputActive": active, "outputState": f"OBS_WEBSOCKET_OUTPUT_{done}"}, EVENT_OUTPUTS)
+
+    def _req_StartStream(self, data):
+        if self.streaming:
+            return STATUS_OUTPUT_RUNNING, None
+        self.streaming = True
+        self._transition("StreamStateChanged", True)
+        return STATUS_SUCCESS, None
+
+    def _req_StopStream(self, data):
+        if not self.streaming:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        self.streaming = False
+        self._transition("StreamStateChanged", False)
+        return STATUS_SUCCESS, None
+
+    def _req_GetRecordStatus(self, data):
+        return STATUS_SUCCESS, {"outputActive": self.recording, "outputPaused": False, "outputBytes": 0}
+
+    def _req_GetVirtualCamStatus(self, data):
+        return STATUS_SUCCESS, {"outputActive": False}
+
+    def _req_StartRecord(self, data):
+        if self.recording:
+            return STATUS_OUTPUT_RUNNING, None
+        self.recording = True
+        self._transition("RecordStateChanged", True)
+        return STATUS_SUCCESS, None
+
+    def _req_StopRecord(self, data):
+        if not self.recording:
+            return STATUS_OUTPUT_NOT_RUNNING, None
+        self.recording = False
+        self._transition("RecordStateChanged", False)
+        return STATUS_SUCCESS, {"outputPath": "/tmp/fake.mkv"}
+
+async def serve(args):
+    scenes = [f"Scene {i}" for i in range(args.scenes)] if args.scenes else None
+    server = FakeObsServer(args.host, args.port, args.password, args.latency, scenes)
+    await server.start()
+    print(f"Fake OBS listening on ws://{args.host}:{args.port} ({len(server.scenes)} scenes, {args.latency * 1000:.0f} ms latency)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stand-in OBS WebSocket v5 server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4455)
+    parser.add_argument("--password", default="")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--scenes", type=int, default=0, help="generate this many scenes instead of the defaults")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import create_bot
+from config import Config
+from secret_manager import SecretManager
+from ratelimit import RateLimiter, Limit, DEFAULT_LIMITS
+from fake_obs import FakeObsServer
+from fake_discord import FakeInteraction, invoke, autocomplete
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+def report(label, samples, elapsed):
+    if not samples:
+        print(f"{label:>13}: no samples")
+        return
+    samples = sorted(samples)
+    print(f"{label:>13}: {len(samples) / elapsed:8.0f} ops/s  "
+          f"p50 {percentile(samples, 0.5) * 1000:7.2f} ms  p95 {percentile(samples, 0.95) * 1000:7.2f} ms  "
+          f"p99 {percentile(samples, 0.99) * 1000:7.2f} ms  max {samples[-1] * 1000:7.2f} ms")
+
+async def user_session(bot, scenes, user_id, rounds, discord_latency, results, rng):
+    # Each round types a scene name keystroke by keystroke, then switches to it
+    for _ in range(rounds):
+        scene = rng.choice(scenes)
+        for length in range(1, min(len(scene), 6) + 1):
+            interaction = FakeInteraction(user_id, latency=discord_latency)
+            start = time.perf_counter()
+            await autocomplete(bot, "switch", "scene", interaction, scene[:length])
+            results["autocomplete"].append(time.perf_counter() - start)
+
+        interaction = FakeInteraction(user_id, latency=discord_latency)
+        start = time.perf_counter()
+        await invoke(bot, "switch", interaction, scene=scene)
+        results["switch"].append(time.perf_counter() - start)
+        if interaction.response.acked_at:
+            results["switch ack"].append(interaction.response.acked_at - start)
+
+async def run(args):
+    scenes = [f"Scene {i:04d} - Camera {i % 7}" for i in range(args.scenes)]
+    server = FakeObsServer(port=args.port, password="bench", latency=args.obs_latency, scenes=scenes)
+    await server.start()
+
+    bot = create_bot(Config(obs_password="bench", obs_host="127.0.0.1", obs_port=args.port), SecretManager())
+    if not args.rate_limits:
+        # Every simulated user shares one guild; measure the command path, not the limiter
+        bot.limiter = RateLimiter({key: Limit(10 ** 9, 1.0) for key in DEFAULT_LIMITS})
+    # setup_hook never runs here; start the audit writer so commands pay its real cost
+    bot.audit.start()
+    instance = bot.obs.default
+    instance.ensure_connected()
+    while not instance.scenes.loaded:
+        await asyncio.sleep(0.01)
+
+    results = {"autocomplete": [], "switch": [], "switch ack": []}
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        user_session(bot, scenes, 1000 + i, args.rounds, args.discord_latency, results, random.Random(rng.random()))
+        for i in range(args.users)
+    ))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.users} users x {args.rounds} rounds, {args.scenes} scenes, "
+          f"OBS latency {args.obs_latency * 1000:.0f} ms, Discord latency {args.discord_latency * 1000:.0f} ms")
+    print(f"OBS saw {server.requests} requests over {server.connections} connection(s) in {elapsed:.2f} s")
+    for label, samples in results.items():
+        report(label, samples, elapsed)
+    for (metric, labels), count in sorted(bot.metrics.counters.items()):
+        print(f"{metric}{dict(labels)}: {count}")
+
+    await bot.close()
+    await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test switch and autocomplete against a fake OBS")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--scenes", type=int, default=500)
+    parser.add_argument("--obs-latency", type=float, default=0.005)
+    parser.add_argument("--discord-latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=14455)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limits", action="store_true", help="apply the default per-user and per-guild limits")
+    args = parser.parse_args()
+
+    # Keep the bot's state files (moderators, command sync) out of the working tree
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
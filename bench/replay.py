@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import create_bot
+from config import Config, MACROS_FILE
+from secret_manager import SecretManager
+from ratelimit import RateLimiter, Limit, DEFAULT_LIMITS
+from trace_recorder import read_runs, COMMAND, OWNER, MODERATOR
+from fake_obs import FakeObsServer
+from fake_discord import FakeInteraction, invoke, autocomplete
+from load_test import percentile, report
+
+# Seconds between samples of the bot's queues while replaying
+SAMPLE_INTERVAL = 0.01
+
+def option_value(value):
+    # Members and roles were recorded as aliases; stand in with a matching object
+    if isinstance(value, dict):
+        alias = value.get("member") or value.get("role")
+        name = f"User {alias}" if "member" in value else f"Role {alias}"
+        return SimpleNamespace(id=alias, display_name=name, name=name, mention=f"<@{alias}>", roles=[])
+    return value
+
+def make_interaction(event, discord_latency):
+    owner_id = event["u"] if event["r"] == OWNER else 0
+    interaction = FakeInteraction(event["u"], guild_id=event["g"], owner_id=owner_id, latency=discord_latency)
+    interaction.namespace = SimpleNamespace(**{key: option_value(value) for key, value in event.get("a", {}).items()})
+    return interaction
+
+def schedule(events, speed):
+    # Seconds after the replay starts at which each event is due, or None at
+    # max speed. Times count from bot start; the idle lead-in before the
+    # first event is not replayed.
+    if not speed:
+        return [None] * len(events)
+    first = events[0]["t"]
+    return [(event["t"] - first) / speed for event in events]
+
+async def drive(bot, event, discord_latency, results, timeout):
+    interaction = make_interaction(event, discord_latency)
+    start = time.perf_counter()
+    try:
+        if event["k"] == COMMAND:
+            params = {key: option_value(value) for key, value in event.get("a", {}).items()}
+            await asyncio.wait_for(invoke(bot, event["n"], interaction, **params), timeout)
+            results[event["n"]].append(time.perf_counter() - start)
+            if interaction.response.acked_at:
+                results[f"{event['n']} ack"].append(interaction.response.acked_at - start)
+        else:
+            await asyncio.wait_for(autocomplete(bot, event["n"], event["p"], interaction, event["v"]), timeout)
+            results["autocomplete"].append(time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        results["timed out"].append(timeout)
+    except Exception as e:
+        print(f"/{event['n']} at {event['t']:.3f}s failed: {e!r}")
+
+async def sample_queues(bot, server, samples):
+    # (in-flight deferred commands, queued OBS operations, OBS requests so far)
+    while True:
+        depth = sum(instance.scheduler.depth for instance in bot.obs.instances.values())
+        samples.append((bot.pipeline.in_flight, depth, server.requests))
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+async def run(args, events):
+    scenes = {event["a"]["scene"] for event in events if event["k"] == COMMAND and isinstance(event.get("a", {}).get("scene"), str)}
+    server = FakeObsServer(port=args.port, password="replay", latency=args.obs_latency,
+                           scenes=sorted(scenes) or None)
+    await server.start()
+
+    bot = create_bot(Config(obs_password="replay", obs_host="127.0.0.1", obs_port=args.port), SecretManager())
+    if not args.rate_limits:
+        bot.limiter = RateLimiter({key: Limit(10 ** 9, 1.0) for key in DEFAULT_LIMITS})
+    for event in events:
+        if event["r"] == MODERATOR:
+            bot.moderators.add_user(event["g"], event["u"], f"User {event['u']}")
+    bot.audit.start()
+    instance = bot.obs.default
+    instance.ensure_connected()
+    while not instance.scenes.loaded:
+        await asyncio.sleep(0.01)
+
+    results = defaultdict(list)
+    samples = []
+    lag = []
+    sampler = asyncio.ensure_future(sample_queues(bot, server, samples))
+    loop = asyncio.get_running_loop()
+    tasks = []
+    start = loop.time()
+    for event, offset in zip(events, schedule(events, args.speed)):
+        due = start + offset if offset is not None else loop.time()
+        if due > loop.time():
+            await asyncio.sleep(due - loop.time())
+        elif not args.speed:
+            # Max speed still lets the loop breathe between dispatches
+            await asyncio.sleep(0)
+        lag.append(loop.time() - due)
+        tasks.append(asyncio.ensure_future(drive(bot, event, args.discord_latency, results, args.timeout)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    sampler.cancel()
+
+    trace_span = events[-1]["t"] - events[0]["t"]
+    speed = f"{args.speed:g}x" if args.speed else "max speed"
+    print(f"Replayed {len(events)} events spanning {trace_span:.1f} s at {speed} in {elapsed:.2f} s, "
+          f"OBS latency {args.obs_latency * 1000:.0f} ms")
+    print(f"OBS saw {server.requests} requests over {server.connections} connection(s)")
+    for label, values in sorted(results.items()):
+        report(label, values, elapsed)
+
+    lag.sort()
+    print(f"dispatch lag: p50 {percentile(lag, 0.5) * 1000:.2f} ms  p99 {percentile(lag, 0.99) * 1000:.2f} ms  "
+          f"max {lag[-1] * 1000:.2f} ms")
+    if samples:
+        in_flight = [s[0] for s in samples]
+        depth = [s[1] for s in samples]
+        print(f"queue build-up: in-flight commands max {max(in_flight)} avg {sum(in_flight) / len(in_flight):.1f}, "
+              f"queued OBS operations max {max(depth)} avg {sum(depth) / len(depth):.1f}")
+    for (metric, labels), count in sorted(bot.metrics.counters.items()):
+        if not metric.startswith("streamcast_gateway"):
+            print(f"{metric}{dict(labels)}: {count}")
+
+    await bot.close()
+    await server.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded interaction trace against a fake OBS")
+    parser.add_argument("trace", help="trace file written with STREAMCAST_TRACE")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale, e.g. 1, 4 or 0 for as fast as possible")
+    parser.add_argument("--obs-latency", type=float, default=0.005)
+    parser.add_argument("--discord-latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=14456)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a replayed command counts as timed out")
+    parser.add_argument("--macros", help="macros.json to use for replayed /macro commands")
+    parser.add_argument("--rate-limits", action="store_true", help="apply the default per-user and per-guild limits")
+    parser.add_argument("--run", type=int, default=0,
+                        help="session to replay, from 1, when restarts appended several to the file; default the last")
+    args = parser.parse_args()
+
+    runs = read_runs(args.trace)
+    if not runs:
+        print(f"No events in {args.trace}")
+        return
+    if not 0 <= args.run <= len(runs):
+        print(f"{args.trace} holds {len(runs)} run(s)")
+        return
+    events = runs[args.run - 1]
+    if len(runs) > 1:
+        print(f"Replaying run {args.run or len(runs)} of {len(runs)}")
+
+    # Keep the bot's state files (moderators, audit log) out of the working tree
+    macros = os.path.abspath(args.macros) if args.macros else None
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        if macros:
+            shutil.copy(macros, MACROS_FILE)
+        asyncio.run(run(args, events))
+
+if __name__ == "__main__":
+    main()
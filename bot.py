@@ -0,0 +1,912 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from config import COMMAND_SYNC_FILE, MODERATORS_FILE, OBS_INSTANCES_FILE, MACROS_FILE, AUDIT_DIR
+from obs_registry import ObsRegistry, DEFAULT_INSTANCE, ALL_TARGETS
+from obs_session import ObsError
+from obs_scheduler import MERGED, SUPERSEDED
+from obs_state import STREAM, STARTING, ACTIVE, RECONNECTING, STOPPING, STOPPED, RESOURCE_NOT_FOUND
+from moderators import ModeratorStore, GLOBAL_SCOPE
+from metrics import Metrics, process_rss, current_command
+from macros import MacroStore, MacroError, MACRO_TIMEOUT
+from scene_index import SceneIndex
+from ratelimit import RateLimiter, limits_from_overrides, CHEAP, EXPENSIVE
+from ui_bridge import STATUS, OBS, FEED, SHARDS
+from obs_stats import FIELDS
+from pipeline import CommandPipeline, Reply
+from audit import AuditLog
+from trace_recorder import TraceRecorder
+
+# Seconds between per-shard latency / guild count reports
+SHARD_REPORT_INTERVAL = 30.0
+
+LEAN_PROFILE = "lean"
+DEFAULT_PROFILE = "default"
+
+# Longest reply text kept per audit record, and /history entries per page
+AUDIT_OUTCOME_LENGTH = 200
+HISTORY_PAGE_SIZE = 10
+# Fingerprint recorded for a scope whose commands were removed
+CLEARED = "cleared"
+
+def audit_value(value):
+    # Members, roles and channels are kept as their name, not the object
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return getattr(value, "display_name", None) or getattr(value, "name", None) or str(value)
+
+def gateway_options(profile=LEAN_PROFILE):
+    if profile == DEFAULT_PROFILE:
+        return {"intents": discord.Intents.default()}
+    # Slash commands arrive as interactions whatever the intents. Guild info
+    # (owner, roles) is all the permission checks need, and option values
+    # carry their own member data, so nothing else is subscribed or cached.
+    intents = discord.Intents.none()
+    intents.guilds = True
+    return {
+        "intents": intents,
+        "max_messages": None,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+    }
+
+class StreamBot(commands.AutoShardedBot):
+    # Every shard of this process shares one bot object and one event loop,
+    # so moderators, scene caches and OBS sessions are naturally consistent
+    # across shards. Without a shard count discord.py uses the recommended
+    # one, which is a single shard for small bots.
+    def __init__(self, obs_registry, moderators=None, sync_guilds=None, metrics=None, metrics_port=None, macros=None, limiter=None,
+                 shard_count=None, shard_ids=None, gateway_profile=LEAN_PROFILE, audit=None):
+        super().__init__(command_prefix="!", shard_count=shard_count, shard_ids=shard_ids, **gateway_options(gateway_profile))
+        self.gateway_profile = gateway_profile
+        self.started = time.monotonic()
+        self.sync_guilds = sync_guilds or []
+        self.moderators = moderators
+        self.obs = obs_registry
+        self.macros = macros or MacroStore(MACROS_FILE)
+        self.limiter = limiter or RateLimiter()
+        self.metrics = metrics or Metrics()
+        self.metrics_port = metrics_port
+        self.pipeline = CommandPipeline(self.metrics)
+        self.pipeline.on_finished.append(self.report_command)
+        self.audit = audit or AuditLog(AUDIT_DIR)
+        # Optional TraceRecorder, attached by create_bot once the commands exist
+        self.recorder = None
+        self.status_callback = None
+        # Optional UiBridge; everything the GUI shows is posted through it
+        self.ui_events = None
+        self._shard_reporter = None
+        self.metrics.gauge("streamcast_process_rss_bytes", {}, lambda: process_rss() or 0)
+        for instance in self.obs.instances.values():
+            instance.health.on_change.append(self.report_health)
+
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # Count gateway traffic here rather than with a listener, which would
+        # cost a task per event
+        if event_name == "socket_event_type":
+            self.metrics.increment("streamcast_gateway_events_total", {"event": args[0]})
+            return
+        super().dispatch(event_name, *args, **kwargs)
+
+    def gateway_summary(self, top=5):
+        events = sorted(((labels[0][1], count) for (metric, labels), count in self.metrics.counters.items()
+                         if metric == "streamcast_gateway_events_total"), key=lambda item: -item[1])
+        minutes = max(time.monotonic() - self.started, 1.0) / 60
+        total = sum(count for _, count in events)
+        rss = process_rss()
+        lines = [f"profile {self.gateway_profile} · RSS {rss / 1048576:.1f} MiB" if rss else f"profile {self.gateway_profile}",
+                 f"{total} events · {total / minutes:.1f}/min"]
+        lines += [f"{event}: {count}" for event, count in events[:top]]
+        return lines
+
+    async def setup_hook(self):
+        await self.sync_commands()
+        self.obs.ensure_connected()
+        self.audit.start()
+        if self.recorder is not None:
+            self.recorder.start()
+        self._shard_reporter = asyncio.ensure_future(self._report_shards_periodically())
+        if self.metrics_port:
+            try:
+                await self.metrics.start_http(port=self.metrics_port)
+            except OSError as e:
+                print(f"Could not start metrics endpoint on port {self.metrics_port}: {e}")
+
+    def command_fingerprint(self, guild=None):
+        payload = sorted((cmd.to_dict(self.tree) for cmd in self.tree.get_commands(guild=guild)), key=lambda c: c["name"])
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    async def sync_commands(self):
+        # Syncing is a rate-limited HTTP call, so only push the tree when it changed
+        try:
+            with open(COMMAND_SYNC_FILE, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            state = {}
+
+        synced = state.setdefault(str(self.application_id), {})
+        guilds = [discord.Object(id=guild_id) for guild_id in self.sync_guilds] or [None]
+        changed = False
+        # Commands registered both globally and in a server show up twice
+        # there, so registrations this run no longer targets are removed once.
+        # Older versions always synced globally, hence the default.
+        targets = {"global" if guild is None else str(guild.id) for guild in guilds}
+        if self.sync_guilds:
+            synced.setdefault("global", None)
+        stale = [key for key, fingerprint in synced.items() if key not in targets and fingerprint != CLEARED]
+        for key in stale:
+            if key == "global":
+                await self.http.bulk_upsert_global_commands(self.application_id, payload=[])
+            else:
+                await self.http.bulk_upsert_guild_commands(self.application_id, int(key), payload=[])
+            synced[key] = CLEARED
+            changed = True
+
+        for guild in guilds:
+            if guild is not None:
+                self.tree.copy_global_to(guild=guild)
+            key = "global" if guild is None else str(guild.id)
+            fingerprint = self.command_fingerprint(guild)
+            if synced.get(key) == fingerprint:
+                continue
+            await self.tree.sync(guild=guild)
+            synced[key] = fingerprint
+            changed = True
+
+        if changed:
+            try:
+                with open(COMMAND_SYNC_FILE + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(COMMAND_SYNC_FILE + ".tmp", COMMAND_SYNC_FILE)
+            except IOError as e:
+                print(f"Could not save command sync state: {e}")
+
+    async def close(self):
+        if self._shard_reporter is not None:
+            self._shard_reporter.cancel()
+        await self.pipeline.close()
+        await self.audit.close()
+        if self.recorder is not None:
+            await self.recorder.close()
+        await self.moderators.close()
+        await self.metrics.close()
+        await self.obs.close()
+        if not self.shards:
+            # AutoShardedClient.close expects launched shards; a bot that never
+            # got past login only has the HTTP session to close
+            await discord.Client.close(self)
+            return
+        await super().close()
+
+    def is_owner_or_mod(self, interaction: discord.Interaction):
+        is_owner = interaction.user.id == interaction.guild.owner_id
+        is_mod = self.moderators.is_moderator(interaction.guild.id, interaction.user)
+        return is_owner or is_mod
+
+    def publish(self, kind, **data):
+        if self.ui_events is not None:
+            self.ui_events.post(kind, **data)
+
+    def report_status(self, text, color, identity=None):
+        if self.status_callback:
+            self.status_callback(text, color, identity)
+        self.publish(STATUS, text=text, color=color, identity=identity)
+
+    def report_health(self, monitor):
+        self.publish(OBS, instance=monitor.name, connected=monitor.available, rtt=monitor.rtt, detail=monitor.describe())
+
+    def shard_summary(self):
+        # [(shard id, latency seconds or None, guild count)]
+        guilds = {}
+        for guild in self.guilds:
+            guilds[guild.shard_id] = guilds.get(guild.shard_id, 0) + 1
+        summary = []
+        for shard_id, shard in sorted(self.shards.items()):
+            latency = None if shard.is_closed() or shard.latency != shard.latency else shard.latency
+            summary.append((shard_id, latency, guilds.get(shard_id, 0)))
+        return summary
+
+    def report_shards(self):
+        self.publish(SHARDS, shards=self.shard_summary())
+
+    async def _report_shards_periodically(self):
+        while True:
+            await asyncio.sleep(SHARD_REPORT_INTERVAL)
+            self.report_shards()
+
+    def report_command(self, command, interaction, message, ok, seconds):
+        outcome = "ok" if ok else "failed"
+        self.publish(FEED, text=f"{time.strftime('%H:%M:%S')}  /{command} by {interaction.user.display_name} · {outcome} · {seconds * 1000:.0f} ms")
+        self.audit_command(interaction, command, message, ok, seconds)
+
+    def audit_command(self, interaction, command, outcome, ok, seconds):
+        # Serialising and writing happen in the audit writer, never here
+        self.audit.record({
+            "ts": time.time(),
+            "guild": interaction.guild_id,
+            "user": interaction.user.id,
+            "name": interaction.user.display_name,
+            "command": command,
+            "args": {key: audit_value(value) for key, value in vars(interaction.namespace).items()},
+            "outcome": (outcome or "").strip()[:AUDIT_OUTCOME_LENGTH],
+            "ok": ok,
+            "ms": round(seconds * 1000, 1),
+        })
+
+def create_bot(config, secret_mgr):
+    # Everything comes from the already-decrypted Config; see config.load_config
+    moderator_store = ModeratorStore(MODERATORS_FILE, secret_mgr)
+    moderator_store.load(legacy=config.legacy_moderators)
+
+    metrics = Metrics()
+    obs_registry = ObsRegistry(metrics, config.stats_interval, config.preview_width)
+    obs_registry.add(DEFAULT_INSTANCE, config.obs_host, config.obs_port, config.obs_password)
+    obs_registry.load(OBS_INSTANCES_FILE)
+
+    limiter = RateLimiter(limits_from_overrides(config.limits))
+
+    # Shard ids only mean something against a fixed total
+    shard_ids = config.shard_ids if config.shard_count else None
+
+    gateway_profile = config.gateway_profile
+    if gateway_profile not in (LEAN_PROFILE, DEFAULT_PROFILE):
+        print(f"Unknown gateway profile '{gateway_profile}', using '{LEAN_PROFILE}'")
+        gateway_profile = LEAN_PROFILE
+
+    bot = StreamBot(obs_registry, moderator_store, config.sync_guilds, metrics, config.metrics_port,
+                    MacroStore(MACROS_FILE), limiter, config.shard_count, shard_ids, gateway_profile)
+    register_commands(bot)
+
+    # Optional trace of every interaction for bench/replay.py, e.g. traces/%Y%m%d-%H%M%S.jsonl.gz
+    if config.trace_path:
+        trace_path = time.strftime(config.trace_path)
+        if os.path.dirname(trace_path):
+            os.makedirs(os.path.dirname(trace_path), exist_ok=True)
+        bot.recorder = TraceRecorder(trace_path, moderator_store)
+        bot.recorder.instrument(bot.tree)
+    return bot
+
+def register_commands(bot):
+    async def respond(interaction, *args, ok=True, **kwargs):
+        # ok=False marks refusals (permissions, limits, bad input) in the audit log
+        await interaction.response.send_message(*args, **kwargs)
+        bot.metrics.mark_ack()
+        running = current_command.get()
+        if running:
+            outcome = args[0] if args else kwargs["embed"].title
+            bot.audit_command(interaction, running[0], outcome, ok, time.perf_counter() - running[1])
+
+    def throttled(interaction, budget):
+        retry_after = bot.limiter.check(budget, interaction.guild_id, interaction.user.id)
+        if retry_after:
+            bot.metrics.increment("streamcast_rate_limited_total", {"budget": budget})
+        return retry_after
+
+    async def reject_throttled(interaction):
+        # Checked after permissions, so only moderators spend OBS budget
+        retry_after = throttled(interaction, EXPENSIVE)
+        if retry_after:
+            await respond(interaction, f" Slow down, try again in {retry_after:.1f}s.", ephemeral=True, ok=False)
+        return bool(retry_after)
+
+    async def reject_offline(interaction, instances):
+        # Circuit breaker: answer at once rather than wait on a dead link.
+        # Fan-outs with some instances still up go ahead and report per instance.
+        if all(not instance.health.available for instance in instances):
+            details = "; ".join(f"{instance.name}: {instance.health.describe()}" for instance in instances)
+            await respond(interaction, f" OBS is offline - {details}", ephemeral=True, ok=False)
+            return True
+        return False
+
+    def describe(outcome, message):
+        if outcome.status == MERGED:
+            return f"{message} (merged with another request)"
+        return message
+
+    def format_fan_out(title, results):
+        lines = []
+        for result in results:
+            latency = f"{result.latency * 1000:.0f} ms"
+            if result.error is not None:
+                lines.append(f"• **{result.instance.name}**: failed - {result.error} ({latency})")
+            else:
+                lines.append(f"• **{result.instance.name}**: {result.message} ({latency})")
+        return f"{title}\n" + "\n".join(lines)
+
+    async def target_autocomplete(interaction: discord.Interaction, current: str):
+        targets = bot.obs.names() + [ALL_TARGETS]
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in targets if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="addmod", description="Promote a user to moderator (Owner Only)")
+    @bot.metrics.instrument("addmod")
+    async def addmod(interaction: discord.Interaction, user: discord.Member):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        bot.moderators.add_user(interaction.guild.id, user.id, user.display_name)
+
+        await respond(interaction, f" {user.mention} is now a StreamCast Moderator.", ephemeral=False)
+
+    @bot.tree.command(name="remmod", description="Remove moderator privileges (Owner Only)")
+    @bot.metrics.instrument("remmod")
+    async def remmod(interaction: discord.Interaction, user: discord.Member):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        if bot.moderators.remove_user(interaction.guild.id, user.id):
+            await respond(interaction, f" {user.display_name} has been removed from moderators.", ephemeral=False)
+        else:
+            await respond(interaction, "User is not a moderator.", ephemeral=True, ok=False)
+
+    @bot.tree.command(name="addmodrole", description="Grant moderator privileges to a role (Owner Only)")
+    @bot.metrics.instrument("addmodrole")
+    async def addmodrole(interaction: discord.Interaction, role: discord.Role):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        bot.moderators.add_role(interaction.guild.id, role.id, role.name)
+        await respond(interaction, f" Members of {role.mention} are now StreamCast Moderators.", ephemeral=False)
+
+    @bot.tree.command(name="remmodrole", description="Remove moderator privileges from a role (Owner Only)")
+    @bot.metrics.instrument("remmodrole")
+    async def remmodrole(interaction: discord.Interaction, role: discord.Role):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        if bot.moderators.remove_role(interaction.guild.id, role.id):
+            await respond(interaction, f" {role.name} no longer grants moderator privileges.", ephemeral=False)
+        else:
+            await respond(interaction, "Role is not a moderator role.", ephemeral=True, ok=False)
+
+    @bot.tree.command(name="listmod", description="Show all StreamCast moderators")
+    @bot.metrics.instrument("listmod")
+    async def listmod(interaction: discord.Interaction):
+        acl = bot.moderators.acl(interaction.guild.id)
+        legacy = bot.moderators.acl(GLOBAL_SCOPE)
+        entries = [f"• {name}" for name in acl.users.values()]
+        entries += [f"• @{name} (role)" for name in acl.roles.values()]
+        entries += [f"• {name} (all servers)" for user_id, name in legacy.users.items() if user_id not in acl.users]
+        if not entries:
+            await respond(interaction, "No moderators have been added yet.", ephemeral=True)
+            return
+
+        mod_list = "\n".join(entries)
+        embed = discord.Embed(title="StreamCast Moderators", description=mod_list, color=discord.Color.blue())
+        await respond(interaction, embed=embed)
+
+    @bot.tree.command(name="switch", description="Change the active OBS scene")
+    @app_commands.describe(scene="The name of the scene to switch to", target="OBS instance to control, or 'all'")
+    @bot.metrics.instrument("switch")
+    async def switch(interaction: discord.Interaction, scene: str, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " You don't have permission to control the stream.", ephemeral=True, ok=False)
+            return
+        if await reject_throttled(interaction):
+            return
+
+        try:
+            instances = bot.obs.resolve(target)
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        async def do_switch(instance):
+            instance.health.check()
+            if instance.scenes.is_current(scene) and not instance.scheduler.switch_pending:
+                return "already active"
+            # Bursts of switches collapse to the newest one per instance
+            outcome = await instance.scheduler.switch_scene(scene)
+            if outcome.status == SUPERSEDED:
+                return "superseded by a newer switch"
+            instance.scene_index.record_use(interaction.user.id, scene)
+            return describe(outcome, "switched")
+
+        async def run_switch():
+            if len(instances) > 1:
+                return format_fan_out(f" Switching to **{scene}**", await bot.obs.fan_out(instances, do_switch))
+            result = await do_switch(instances[0])
+            if result == "already active":
+                return f" **{scene}** is already the active scene."
+            if result.startswith("superseded"):
+                return f" A newer /switch replaced **{scene}** before it reached OBS."
+            return f" Successfully switched to: **{scene}**"
+
+        if len(instances) == 1 and instances[0].scenes.is_current(scene) and not instances[0].scheduler.switch_pending:
+            await respond(interaction, f" **{scene}** is already the active scene.", ephemeral=True)
+            return
+        if await reject_offline(interaction, instances):
+            return
+
+        await bot.pipeline.submit(interaction, "switch", run_switch,
+                                  lambda e: f" Failed to switch scene. Is OBS WebSocket active? Error: {e}")
+
+    @switch.autocomplete('scene')
+    @bot.metrics.instrument("autocomplete")
+    async def scene_autocomplete(interaction: discord.Interaction, current: str):
+        if throttled(interaction, CHEAP):
+            return []
+        try:
+            instance = bot.obs.resolve(getattr(interaction.namespace, "target", None))[0]
+        except KeyError:
+            instance = bot.obs.default
+
+        if not instance.scenes.loaded:
+            instance.ensure_connected()
+            if not instance.health.available:
+                # Say why the list is empty instead of showing nothing
+                return [app_commands.Choice(name=f"OBS is {instance.health.describe()}"[:100], value=current or "offline")]
+
+        return [
+            app_commands.Choice(name=scene[:100], value=scene)
+            for scene in instance.scene_index.search(current, interaction.user.id)
+        ]
+
+    switch.autocomplete('target')(target_autocomplete)
+
+    @bot.tree.command(name="toggle", description="Show or hide a source in an OBS scene")
+    @app_commands.describe(scene="Scene containing the source", source="Source to show or hide", target="OBS instance to control, or 'all'")
+    @bot.metrics.instrument("toggle")
+    async def toggle(interaction: discord.Interaction, scene: str, source: str, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+        if await reject_throttled(interaction):
+            return
+
+        try:
+            instances = bot.obs.resolve(target)
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        if len(instances) == 1:
+            # Answer from the mirrors when they already know the name is wrong
+            instance = instances[0]
+            items = instance.scene_items.cached(scene)
+            if instance.scenes.loaded and scene not in instance.scenes.names:
+                await respond(interaction, f" Unknown scene: **{scene}**", ephemeral=True, ok=False)
+                return
+            if items is not None and items.find(source) is None:
+                await respond(interaction, f" **{source}** is not in **{scene}**.", ephemeral=True, ok=False)
+                return
+
+        async def do_toggle(instance):
+            instance.health.check()
+            # Item ids come from the index, so the toggle itself is one request
+            items = await instance.scene_items.get(scene)
+            item = items.find(source)
+            if item is None:
+                return "not in this scene"
+
+            async def flip():
+                enabled = not item.enabled
+                try:
+                    await instance.session.request("SetSceneItemEnabled", {
+                        "sceneName": scene, "sceneItemId": item.item_id, "sceneItemEnabled": enabled,
+                    })
+                except ObsError as e:
+                    if e.code == RESOURCE_NOT_FOUND:
+                        # The index is out of date; fetch the scene again next time
+                        instance.scene_items.drop(scene)
+                    raise
+                item.enabled = enabled
+                return "shown" if enabled else "hidden"
+
+            # Two moderators hitting the same source at once flip it once
+            outcome = await instance.scheduler.serialized(f"toggle:{scene}:{item.item_id}", flip)
+            instance.source_index(items).record_use(interaction.user.id, source)
+            return describe(outcome, outcome.result)
+
+        async def run_toggle():
+            if len(instances) > 1:
+                return format_fan_out(f" Toggling **{source}** in **{scene}**", await bot.obs.fan_out(instances, do_toggle))
+            result = await do_toggle(instances[0])
+            if result == "not in this scene":
+                return f" **{source}** is not in **{scene}**."
+            state, _, note = result.partition(" (")
+            return f" **{source}** is now {state} in **{scene}**." + (f" ({note}" if note else "")
+
+        if await reject_offline(interaction, instances):
+            return
+        await bot.pipeline.submit(interaction, "toggle", run_toggle,
+                                  lambda e: f" Failed to toggle **{source}**. Error: {e}")
+
+    toggle.autocomplete('scene')(scene_autocomplete)
+    toggle.autocomplete('target')(target_autocomplete)
+
+    @toggle.autocomplete('source')
+    @bot.metrics.instrument("autocomplete")
+    async def source_autocomplete(interaction: discord.Interaction, current: str):
+        if throttled(interaction, CHEAP):
+            return []
+        scene = getattr(interaction.namespace, "scene", None)
+        try:
+            instance = bot.obs.resolve(getattr(interaction.namespace, "target", None))[0]
+        except KeyError:
+            instance = bot.obs.default
+        if not scene or (instance.scenes.loaded and scene not in instance.scenes.names):
+            return []
+        if not instance.health.available:
+            return [app_commands.Choice(name=f"OBS is {instance.health.describe()}"[:100], value=current or "offline")]
+
+        # Only the first lookup of a scene asks OBS; later ones are served from the index
+        try:
+            items = await instance.scene_items.get(scene)
+        except ObsError:
+            return []
+        return [
+            app_commands.Choice(name=source[:100], value=source)
+            for source in instance.source_index(items).search(current, interaction.user.id)
+        ]
+
+    @bot.tree.command(name="start_stream", description="Starts the OBS live stream")
+    @app_commands.describe(target="OBS instance to control, or 'all'")
+    @bot.metrics.instrument("start_stream")
+    async def start_stream(interaction: discord.Interaction, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+        if await reject_throttled(interaction):
+            return
+
+        try:
+            instances = bot.obs.resolve(target)
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        async def do_start(instance):
+            instance.health.check()
+            # Output state is mirrored from OBS events, so this is one request
+            async def start():
+                state = await instance.outputs.state(STREAM)
+                if state in (ACTIVE, RECONNECTING):
+                    return "already live"
+                if state == STARTING:
+                    return "already starting"
+                if state == STOPPING:
+                    return "still stopping"
+                previous = instance.outputs.expect(STREAM, STARTING)
+                try:
+                    await instance.session.request("StartStream")
+                except Exception:
+                    instance.outputs.restore(STREAM, previous, STARTING)
+                    raise
+                return "starting"
+            outcome = await instance.scheduler.serialized("start_stream", start)
+            return describe(outcome, outcome.result)
+
+        async def run_start():
+            if len(instances) > 1:
+                return format_fan_out(" Starting the stream", await bot.obs.fan_out(instances, do_start))
+            result = await do_start(instances[0])
+            if result.startswith("already live"):
+                return " Stream is already live!"
+            if result.startswith("already starting"):
+                return " The stream is already starting."
+            if result.startswith("still stopping"):
+                return " The stream is still stopping, try again in a moment."
+            return " Starting the stream..."
+
+        if await reject_offline(interaction, instances):
+            return
+        await bot.pipeline.submit(interaction, "start_stream", run_start)
+
+    start_stream.autocomplete('target')(target_autocomplete)
+
+    @bot.tree.command(name="stop_stream", description="Stops the active OBS live stream")
+    @app_commands.describe(target="OBS instance to control, or 'all'")
+    @bot.metrics.instrument("stop_stream")
+    async def stop_stream(interaction: discord.Interaction, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+        if await reject_throttled(interaction):
+            return
+
+        try:
+            instances = bot.obs.resolve(target)
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        async def do_stop(instance):
+            instance.health.check()
+            async def stop():
+                state = await instance.outputs.state(STREAM)
+                if state == STOPPED:
+                    return "not live"
+                if state == STOPPING:
+                    return "already stopping"
+                previous = instance.outputs.expect(STREAM, STOPPING)
+                try:
+                    await instance.session.request("StopStream")
+                except Exception:
+                    instance.outputs.restore(STREAM, previous, STOPPING)
+                    raise
+                return "stopped"
+            outcome = await instance.scheduler.serialized("stop_stream", stop)
+            return describe(outcome, outcome.result)
+
+        async def run_stop():
+            if len(instances) > 1:
+                return format_fan_out(" Stopping the stream", await bot.obs.fan_out(instances, do_stop))
+            result = await do_stop(instances[0])
+            if result.startswith("not live"):
+                return " No active stream detected."
+            if result.startswith("already stopping"):
+                return " The stream is already stopping."
+            return " Stream stopped."
+
+        if await reject_offline(interaction, instances):
+            return
+        await bot.pipeline.submit(interaction, "stop_stream", run_stop)
+
+    stop_stream.autocomplete('target')(target_autocomplete)
+
+    # Macro names are matched the same way as scene names
+    macro_index = SceneIndex(bot.macros)
+
+    @bot.tree.command(name="macro", description="Run a saved multi-step OBS macro")
+    @app_commands.describe(name="The macro to run", target="OBS instance to control, or 'all'")
+    @bot.metrics.instrument("macro")
+    async def macro(interaction: discord.Interaction, name: str, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+        if await reject_throttled(interaction):
+            return
+
+        definition = bot.macros.get(name)
+        if definition is None:
+            await respond(interaction, f" Unknown macro: **{name}**", ephemeral=True, ok=False)
+            return
+
+        try:
+            instances = bot.obs.resolve(target)
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        async def do_macro(instance):
+            instance.health.check()
+            # Every step goes out in one RequestBatch round trip
+            async def run():
+                return await instance.session.request_batch(definition.requests, definition.execution_type,
+                                                            definition.halt_on_failure, MACRO_TIMEOUT)
+            outcome = await instance.scheduler.serialized(f"macro:{name}", run)
+            return describe(outcome, definition.summarize(outcome.result))
+
+        async def run_macro():
+            # Any failed step makes the whole reply a failure: ephemeral, and audited as such
+            if len(instances) > 1:
+                results = await bot.obs.fan_out(instances, do_macro)
+                message = format_fan_out(f" Running macro **{name}**", results)
+                if any(result.error is not None for result in results):
+                    raise MacroError(message)
+                return message
+            try:
+                return f" Macro **{name}**: {await do_macro(instances[0])}"
+            except MacroError as e:
+                raise MacroError(f" Macro **{name}** failed: {e}") from None
+
+        def macro_error(e):
+            if isinstance(e, MacroError):
+                return str(e)
+            return f" Macro **{name}** failed. Is OBS WebSocket active? Error: {e}"
+
+        if await reject_offline(interaction, instances):
+            return
+        macro_index.record_use(interaction.user.id, name)
+        await bot.pipeline.submit(interaction, "macro", run_macro, macro_error)
+
+    @macro.autocomplete('name')
+    @bot.metrics.instrument("autocomplete")
+    async def macro_autocomplete(interaction: discord.Interaction, current: str):
+        if throttled(interaction, CHEAP):
+            return []
+        bot.macros.refresh()
+        return [
+            app_commands.Choice(name=name[:100], value=name)
+            for name in macro_index.search(current, interaction.user.id)
+        ]
+
+    macro.autocomplete('target')(target_autocomplete)
+
+    @bot.tree.command(name="obsstats", description="Show OBS encoder and performance statistics")
+    @app_commands.describe(window="Period for the min / avg / max columns", target="OBS instance to inspect")
+    @app_commands.choices(window=[
+        app_commands.Choice(name="Last minute", value=60),
+        app_commands.Choice(name="Last 10 minutes", value=600),
+        app_commands.Choice(name="Last hour", value=3600),
+        app_commands.Choice(name="Last 24 hours", value=86400),
+    ])
+    @bot.metrics.instrument("obsstats")
+    async def obsstats(interaction: discord.Interaction, window: int = 600, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+
+        try:
+            instance = bot.obs.resolve(target)[0]
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        # Answered from the sampled history only; OBS is never queried here
+        sampled_at, current = instance.stats.history.current()
+        summary = instance.stats.history.summary(window)
+        if current is None or summary is None:
+            await respond(interaction, f" No OBS samples yet for **{instance.name}** ({instance.health.describe()}).", ephemeral=True, ok=False)
+            return
+
+        embed = discord.Embed(title=f"OBS Stats · {instance.name}", color=discord.Color.blue())
+        for key, label, fmt in FIELDS:
+            low, average, high = summary[key]
+            embed.add_field(
+                name=label,
+                value=f"**{fmt.format(current[key])}**\n{fmt.format(low)} / {fmt.format(average)} / {fmt.format(high)}",
+                inline=True,
+            )
+        embed.set_footer(text=f"Current, then min / avg / max over {window // 60} min · {instance.health.describe()}")
+        embed.timestamp = datetime.fromtimestamp(sampled_at, timezone.utc)
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    obsstats.autocomplete('target')(target_autocomplete)
+
+    @bot.tree.command(name="preview", description="Show a thumbnail of an OBS scene")
+    @app_commands.describe(scene="Scene to preview; defaults to the one on air", target="OBS instance to inspect")
+    @bot.metrics.instrument("preview")
+    async def preview(interaction: discord.Interaction, scene: str = None, target: str = None):
+        if not bot.is_owner_or_mod(interaction):
+            await respond(interaction, " Permission denied.", ephemeral=True, ok=False)
+            return
+
+        try:
+            instance = bot.obs.resolve(target)[0]
+        except KeyError:
+            await respond(interaction, f" Unknown OBS target: **{target}**", ephemeral=True, ok=False)
+            return
+
+        scene = scene or instance.scenes.current_scene
+        if not scene:
+            await respond(interaction, " No scene is on air yet; name one to preview.", ephemeral=True, ok=False)
+            return
+        if instance.scenes.loaded and scene not in instance.scenes.names:
+            await respond(interaction, f" Unknown scene: **{scene}**", ephemeral=True, ok=False)
+            return
+
+        def reply(thumbnail):
+            age = time.monotonic() - thumbnail.taken
+            return Reply(f" Preview of **{scene}** on {instance.name} · {age:.0f}s old",
+                         [discord.File(io.BytesIO(thumbnail.data), thumbnail.filename)])
+
+        # Cached thumbnails are answered at once and spend no OBS budget
+        thumbnail = instance.previews.cached(scene)
+        if thumbnail is not None:
+            content, files = reply(thumbnail)
+            await respond(interaction, content, file=files[0], ephemeral=True)
+            return
+        if await reject_throttled(interaction):
+            return
+        if await reject_offline(interaction, [instance]):
+            return
+
+        async def run_preview():
+            instance.health.check()
+            return reply(await instance.previews.get(scene))
+
+        await bot.pipeline.submit(interaction, "preview", run_preview,
+                                  lambda e: f" Could not capture **{scene}**: {e}", ephemeral=True)
+
+    preview.autocomplete('scene')(scene_autocomplete)
+    preview.autocomplete('target')(target_autocomplete)
+
+    @bot.tree.command(name="stats", description="Show command and OBS latency statistics (Owner Only)")
+    @bot.metrics.instrument("stats")
+    async def stats(interaction: discord.Interaction):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        embed = discord.Embed(title="StreamCast Stats", color=discord.Color.blue())
+        for command, calls, errors, phases in bot.metrics.summary():
+            lines = [f"calls {calls} · errors {errors}"]
+            for phase, hist in sorted(phases.items()):
+                lines.append(f"{phase}: p50 {hist.quantile(0.5) * 1000:.0f} ms · p99 {hist.quantile(0.99) * 1000:.0f} ms")
+            embed.add_field(name=command, value="\n".join(lines), inline=True)
+        if not embed.fields:
+            embed.description = "No commands recorded yet."
+        shards = [f"#{shard_id}: {'-' if latency is None else f'{latency * 1000:.0f} ms'}, {guilds} guilds"
+                  for shard_id, latency, guilds in bot.shard_summary()]
+        if shards:
+            embed.add_field(name="Shards", value="\n".join(shards), inline=False)
+        embed.add_field(name="Gateway", value="\n".join(bot.gateway_summary()), inline=False)
+        queues = [f"{instance.name}: {instance.health.describe()}, {instance.scheduler.depth} queued" for instance in bot.obs.instances.values()]
+        embed.set_footer(text="OBS · " + " · ".join(queues))
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="history", description="Show who ran which StreamCast commands (Owner Only)")
+    @app_commands.describe(user="Only show commands run by this member", page="Page number, newest first")
+    @bot.metrics.instrument("history")
+    async def history(interaction: discord.Interaction, user: discord.Member = None, page: app_commands.Range[int, 1] = 1):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        user_id = user.id if user is not None else None
+        records = await bot.audit.history(interaction.guild.id, user_id, (page - 1) * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE)
+        total = bot.audit.count(interaction.guild.id, user_id)
+        pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+
+        lines = []
+        for record in records:
+            args = " ".join(f"{key}:{value}" for key, value in record["args"].items() if value is not None)
+            line = f"<t:{int(record['ts'])}:f> **{record['name']}** `/{record['command']}{' ' + args if args else ''}`"
+            line += f" · {record['ms']:.0f} ms" if record["ok"] else f" · failed: {record['outcome'][:80]}"
+            lines.append(line)
+
+        title = "StreamCast History" + (f" · {user.display_name}" if user is not None else "")
+        embed = discord.Embed(title=title, description="\n".join(lines) or "No commands recorded.", color=discord.Color.blue())
+        embed.set_footer(text=f"Page {page} of {pages} · {total} commands")
+        await respond(interaction, embed=embed, ephemeral=True)
+
+    @bot.tree.command(name="cancel", description="Cancel StreamCast commands still waiting on OBS (Owner Only)")
+    @app_commands.describe(user="Only cancel commands run by this member")
+    @bot.metrics.instrument("cancel")
+    async def cancel(interaction: discord.Interaction, user: discord.Member = None):
+        if interaction.user.id != interaction.guild.owner_id:
+            await respond(interaction, " This command is restricted to the Server Owner.", ephemeral=True, ok=False)
+            return
+
+        cancelled = bot.pipeline.cancel(interaction.guild.id, user.id if user is not None else None)
+        if not cancelled:
+            await respond(interaction, " No commands are waiting on OBS.", ephemeral=True)
+            return
+        await respond(interaction, f" Cancelled {cancelled} command(s) waiting on OBS.", ephemeral=True)
+
+    @bot.event
+    async def on_ready():
+        if bot.moderators.adopt_legacy([guild.id for guild in bot.guilds]):
+            print("Moved moderators from the old shared list to each server's own list")
+        bot.report_status("Status: Online & Listening", "green", f"Bot: {bot.user.name}")
+        bot.report_shards()
+        print(f"Logged in as {bot.user}")
+
+    @bot.event
+    async def on_shard_ready(shard_id):
+        bot.publish(FEED, text=f"{time.strftime('%H:%M:%S')}  Shard {shard_id} ready")
+        bot.report_shards()
+
+    @bot.event
+    async def on_shard_disconnect(shard_id):
+        bot.publish(FEED, text=f"{time.strftime('%H:%M:%S')}  Shard {shard_id} disconnected")
+        bot.report_shards()
+
+    @bot.event
+    async def on_shard_resumed(shard_id):
+        bot.report_shards()
+
+async def run_bot(bot, token):
+    try:
+        await bot.start(token)
+    except discord.LoginFailure:
+        bot.report_status("Status: Invalid Bot Token", "#ff4444")
+    except Exception as e:
+        bot.report_status(f"Status: Error - {e}", "#ff4444")
@@ -0,0 +1,212 @@
+import json
+import os
+import re
+
+APP_NAME = "StreamCast"
+VERSION = "v1.1.4"
+
+CONFIG_FILE = ".streamcast"
+CONFIG_VERSION = 2
+ENV_FILE = ".env"
+COMMAND_SYNC_FILE = ".command_sync.json"
+MODERATORS_FILE = ".moderators"
+OBS_INSTANCES_FILE = "obs_instances.json"
+MACROS_FILE = "macros.json"
+AUDIT_DIR = "audit"
+
+# "id:name" pairs from the old MODERATORS= line; a pair only starts at
+# "<digits>:" so names containing commas or colons survive
+LEGACY_MODERATOR = re.compile(r"(\d+):(.*?)(?=,\d+:|$)", re.S)
+
+def non_negative(value):
+    number = float(value)
+    if number < 0:
+        raise ValueError(f"{value} is negative")
+    return number
+
+def parse_shard_ids(text):
+    # "0-3" or "0,2,4"
+    shard_ids = []
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.extend(range(int(first), int(last) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    return shard_ids
+
+class Config:
+    # Everything StreamCast reads at startup. Decrypted and parsed once by
+    # load_config and then shared by the GUI, the headless entry point and
+    # create_bot. Stored encrypted as schema-versioned JSON.
+    __slots__ = ("discord_token", "sync_guilds", "shard_count", "shard_ids", "gateway_profile",
+                 "obs_host", "obs_port", "obs_password", "stats_interval", "preview_width",
+                 "metrics_port", "limits", "trace_path", "legacy_moderators", "_stored")
+
+    def __init__(self, discord_token="", obs_password="", obs_host="localhost", obs_port=4455):
+        self.discord_token = discord_token
+        self.sync_guilds = []
+        self.shard_count = None
+        self.shard_ids = None
+        self.gateway_profile = "lean"
+        self.obs_host = obs_host
+        self.obs_port = obs_port
+        self.obs_password = obs_password
+        self.stats_interval = 1.0
+        self.preview_width = 480
+        self.metrics_port = None
+        # {"expensive_user": "5/10", ...}, see ratelimit.limits_from_overrides
+        self.limits = {}
+        # strftime pattern for an interaction trace (see trace_recorder); None records nothing
+        self.trace_path = None
+        # Seeds the moderator store the first time only
+        self.legacy_moderators = {}
+        # Saved values of fields overridden by environment variables
+        self._stored = {}
+
+    def to_dict(self):
+        saved = {name: self._stored.get(name, getattr(self, name)) for name in self.__slots__ if name != "_stored"}
+        return {
+            "version": CONFIG_VERSION,
+            "discord": {
+                "token": saved["discord_token"],
+                "sync_guilds": saved["sync_guilds"],
+                "shard_count": saved["shard_count"],
+                "shard_ids": saved["shard_ids"],
+                "gateway_profile": saved["gateway_profile"],
+            },
+            "obs": {
+                "host": saved["obs_host"],
+                "port": saved["obs_port"],
+                "password": saved["obs_password"],
+                "stats_interval": saved["stats_interval"],
+                "preview_width": saved["preview_width"],
+            },
+            "metrics": {"port": saved["metrics_port"]},
+            "limits": saved["limits"],
+            "trace": saved["trace_path"],
+            "legacy_moderators": saved["legacy_moderators"],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version", 0) > CONFIG_VERSION:
+            raise ValueError(f"config version {data['version']} is newer than this build")
+        discord_section = data.get("discord", {})
+        obs_section = data.get("obs", {})
+        config = cls(discord_section.get("token", ""), obs_section.get("password", ""),
+                     obs_section.get("host", "localhost"), int(obs_section.get("port", 4455)))
+        config.sync_guilds = [int(g) for g in discord_section.get("sync_guilds", [])]
+        config.shard_count = discord_section.get("shard_count")
+        config.shard_ids = discord_section.get("shard_ids")
+        config.gateway_profile = discord_section.get("gateway_profile", "lean")
+        config.stats_interval = max(0.0, float(obs_section.get("stats_interval", 1.0)))
+        config.preview_width = int(obs_section.get("preview_width", 480))
+        config.metrics_port = data.get("metrics", {}).get("port")
+        config.limits = dict(data.get("limits", {}))
+        config.trace_path = data.get("trace")
+        config.legacy_moderators = dict(data.get("legacy_moderators", {}))
+        return config
+
+    @classmethod
+    def from_legacy(cls, env_vars):
+        # Version 1: the flat KEY=value .env written by older releases
+        config = cls(env_vars.get("DISCORD_TOKEN", ""), env_vars.get("OBS_PASSWORD", ""))
+        config.legacy_moderators = {
+            user_id: name for user_id, name in LEGACY_MODERATOR.findall(env_vars.get("MODERATORS", ""))
+        }
+        return config
+
+    def update(self, **values):
+        # Explicit edits (the setup window) are saved, unlike environment overrides
+        for name, value in values.items():
+            self._stored.pop(name, None)
+            setattr(self, name, value)
+
+    def _override(self, name, value):
+        self._stored.setdefault(name, getattr(self, name))
+        setattr(self, name, value)
+
+    def apply_environ(self, environ):
+        # Environment variables win for this run but are never saved
+        def get(name, parse):
+            if not environ.get(name):
+                return None
+            try:
+                return parse(environ[name])
+            except ValueError:
+                print(f"Ignoring {name}={environ[name]}")
+                return None
+
+        overrides = {
+            "discord_token": get("DISCORD_TOKEN", str),
+            "obs_password": get("OBS_PASSWORD", str),
+            "sync_guilds": get("STREAMCAST_SYNC_GUILDS", lambda v: [int(g) for g in v.split(",") if g.strip()]),
+            "metrics_port": get("STREAMCAST_METRICS_PORT", int),
+            "stats_interval": get("STREAMCAST_STATS_INTERVAL", non_negative),
+            "preview_width": get("STREAMCAST_PREVIEW_WIDTH", int),
+            "shard_count": get("STREAMCAST_SHARD_COUNT", int),
+            "shard_ids": get("STREAMCAST_SHARD_IDS", parse_shard_ids),
+            "gateway_profile": get("STREAMCAST_GATEWAY_PROFILE", str),
+            "trace_path": get("STREAMCAST_TRACE", str),
+        }
+        for name, value in overrides.items():
+            if value is not None:
+                self._override(name, value)
+
+        prefix = "STREAMCAST_LIMIT_"
+        limits = {key[len(prefix):].lower(): value for key, value in environ.items() if key.startswith(prefix) and value}
+        if limits:
+            self._override("limits", dict(self.limits, **limits))
+
+def read_env(secret_mgr, path=ENV_FILE):
+    env_vars = {}
+    if not os.path.exists(path):
+        return env_vars
+    try:
+        decrypted_content = secret_mgr.decrypt_content(path)
+        for line in decrypted_content.splitlines():
+            if "=" in line:
+                k, v = line.split("=", 1)
+                env_vars[k.strip()] = v.strip()
+    except Exception:
+        pass
+    return env_vars
+
+def save_config(config, secret_mgr, path=CONFIG_FILE):
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(config.to_dict(), f, ensure_ascii=False)
+        secret_mgr.encrypt_file(temp_path)
+        os.replace(temp_path, path)
+        return True
+    except IOError as e:
+        print(f"Could not save configuration: {e}")
+        return False
+
+def load_config(secret_mgr, path=CONFIG_FILE, legacy_path=ENV_FILE, environ=os.environ):
+    # One decrypt per start. A legacy .env is migrated to the new file and
+    # removed once the new file is safely written; one that decrypts to
+    # nothing is kept untouched.
+    config = None
+    if os.path.exists(path):
+        try:
+            config = Config.from_dict(json.loads(secret_mgr.decrypt_content(path)))
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Ignoring unreadable configuration {path}: {e}")
+    if config is None and os.path.exists(legacy_path):
+        env_vars = read_env(secret_mgr, legacy_path)
+        if env_vars:
+            config = Config.from_legacy(env_vars)
+            if save_config(config, secret_mgr, path):
+                os.remove(legacy_path)
+        else:
+            # Could not be decrypted (e.g. the hardware ID changed); leave it
+            # alone rather than replace the user's secrets with an empty file
+            print(f"Could not read {legacy_path}; keeping it and starting with default settings")
+    if config is None:
+        config = Config()
+    config.apply_environ(environ)
+    return config
@@ -0,0 +1,596 @@
+import customtkinter as ctk
+import os
+import shutil
+import threading
+import asyncio
+import webbrowser
+import sys
+from datetime import datetime
+from config import APP_NAME, VERSION, CONFIG_FILE, ENV_FILE, MODERATORS_FILE, AUDIT_DIR, load_config, save_config
+from secret_manager import SecretManager
+from bot import create_bot, run_bot
+from ui_bridge import UiBridge, STATUS, OBS, FEED, SHARDS
+
+# How often the control panel applies queued bot events
+UI_TICK_MS = 100
+
+try:
+    import pystray
+    from pystray import MenuItem as item
+    from PIL import Image, ImageDraw
+except Exception:
+    # pystray raises backend errors, not ImportError, when no display server is available
+    pass
+
+VERSION_URL = "https://stream-cast.netlify.app/version.txt"
+UPDATE_URL = "https://stream-cast.netlify.app/"
+CURRENT_YEAR = datetime.now().year
+COPYRIGHT = f"© {CURRENT_YEAR} Niels Coert. All rights reserved."
+
+# Editable Safety Tips list for easy future updates
+SAFETY_TIPS = [
+    "ℹ️ Tip: Place the bot only in a Discord channel dedicated to staff to avoid unauthorized use.",
+]
+
+# Set the appearance mode and default color theme
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("blue")
+
+class ContentWindow(ctk.CTkToplevel):
+    def __init__(self, master, title, content_text, extra_content_callback=None):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("550x600")
+        self.attributes("-topmost", True)
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.scroll_frame = ctk.CTkScrollableFrame(self, label_text=title)
+        self.scroll_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        content_lbl = ctk.CTkLabel(
+            self.scroll_frame, 
+            text=content_text, 
+            justify="left", 
+            wraplength=480, 
+            font=ctk.CTkFont(size=13)
+        )
+        content_lbl.pack(padx=15, pady=15)
+
+        if extra_content_callback:
+            extra_content_callback(self.scroll_frame)
+
+        self.close_button = ctk.CTkButton(self, text="Close", command=self.destroy)
+        self.close_button.grid(row=1, column=0, pady=15)
+
+class AboutWindow(ctk.CTkToplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title(f"About {APP_NAME}")
+        self.geometry("450x580")
+        self.resizable(False, False)
+        self.attributes("-topmost", True)
+        
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.logo_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=60))
+        self.logo_label.pack(pady=(30, 0))
+        
+        self.title_label = ctk.CTkLabel(self, text=APP_NAME, font=ctk.CTkFont(size=24, weight="bold"))
+        self.title_label.pack()
+        
+        self.ver_label = ctk.CTkLabel(self, text=f"Version {VERSION}", text_color="gray")
+        self.ver_label.pack(pady=(0, 20))
+
+        self.nav_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.nav_frame.pack(fill="x", padx=40)
+        
+        self.create_nav_item("", "User Guide", self.open_user_guide)
+        self.create_nav_item("", "Terms of Service", self.open_tos)
+        self.create_nav_item("", "Privacy Policy", self.open_privacy)
+        self.create_nav_item("", "Acknowledgements", self.open_credits)
+
+        self.reset_btn = ctk.CTkButton(
+            self, 
+            text=" Delete & Reset App", 
+            command=self.confirm_reset, 
+            fg_color="#990000", 
+            hover_color="#cc0000",
+            height=35
+        )
+        self.reset_btn.pack(pady=(20, 0))
+
+        self.copyright_label = ctk.CTkLabel(self, text=COPYRIGHT, font=ctk.CTkFont(size=10), text_color="gray50")
+        self.copyright_label.pack(side="bottom", pady=15)
+
+    def create_nav_item(self, icon, text, command):
+        btn = ctk.CTkButton(
+            self.nav_frame, 
+            text=f"{icon}  {text}", 
+            command=command, 
+            anchor="w", 
+            fg_color="gray25", 
+            hover_color="gray35",
+            height=40
+        )
+        btn.pack(fill="x", pady=5)
+
+    def confirm_reset(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Confirm Reset")
+        dialog.geometry("400x200")
+        dialog.resizable(False, False)
+        dialog.attributes("-topmost", True)
+        dialog.grid_columnconfigure((0, 1), weight=1)
+
+        msg = ctk.CTkLabel(
+            dialog, 
+            text="Are you sure you want to delete all settings?\n\nThis will remove your Bot Token, OBS Password,\nModerator list and command history. The app will restart.",
+            wraplength=350
+        )
+        msg.grid(row=0, column=0, columnspan=2, pady=20, padx=20)
+
+        cancel_btn = ctk.CTkButton(dialog, text="Cancel", command=dialog.destroy, fg_color="gray30")
+        cancel_btn.grid(row=1, column=0, padx=10, pady=10, sticky="ew")
+
+        confirm_btn = ctk.CTkButton(dialog, text="Yes, Reset", command=self.perform_reset, fg_color="#990000", hover_color="#cc0000")
+        confirm_btn.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+
+    def perform_reset(self):
+        for path in (CONFIG_FILE, ENV_FILE, MODERATORS_FILE):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    print(f"Error deleting {path}: {e}")
+        # The audit log holds Discord user ids and names
+        if os.path.isdir(AUDIT_DIR):
+            try:
+                shutil.rmtree(AUDIT_DIR)
+            except Exception as e:
+                print(f"Error deleting {AUDIT_DIR}: {e}")
+        
+        os.execl(sys.executable, sys.executable, *sys.argv)
+
+    def open_user_guide(self):
+        content = (
+            "USER GUIDE\n\n"
+            "1. OUR PURPOSE\n"
+            f"We designed {APP_NAME} as a bridge between Discord and OBS. Our tool allows you to delegate production tasks "
+            "(like switching scenes) to your trusted Discord moderators so you can focus on your gameplay or content.\n\n"
+            "2. HOW OUR BOT WORKS\n"
+            "The app runs a Discord bot on your local computer. When a moderator uses a command in Discord, "
+            "our bot sends a signal to your local OBS via the WebSocket connection to execute the action.\n\n"
+            "3. AVAILABLE COMMANDS\n"
+            "• /switch [scene_name] [target]: Changes the current OBS scene. Auto-completes with your available scenes.\n"
+            "• /start_stream [target]: Starts the OBS stream if it's not already running.\n"
+            "• /stop_stream [target]: Stops the OBS stream if it's currently active.\n"
+            "  The optional target picks an OBS instance from obs_instances.json, or 'all' to control every instance at once.\n"
+            "• /macro [name] [target]: Runs a multi-step macro from macros.json in a single OBS round trip.\n"
+            "• /addmod [@user]: (Owner Only) Adds a user as a moderator.\n"
+            "• /remmod [@user]: (Owner Only) Removes a user from the moderator list.\n"
+            "• /addmodrole [@role]: (Owner Only) Makes every member of a role a moderator.\n"
+            "• /remmodrole [@role]: (Owner Only) Stops a role from granting moderator access.\n"
+            "• /listmod: Lists all current moderators and their status.\n"
+            "• /obsstats [window] [target]: Shows OBS FPS, skipped frames, CPU, memory and bitrate with min/avg/max.\n"
+            "• /toggle [scene] [source] [target]: Shows or hides one source in a scene. Auto-completes the scene's sources.\n"
+            "• /preview [scene] [target]: Shows a thumbnail of a scene, or of the one on air, only to you.\n"
+            "• /stats: (Owner Only) Shows command counts, errors and latency percentiles.\n"
+            "• /history [user] [page]: (Owner Only) Pages through who ran which command, newest first.\n\n"
+            "4. PERMISSIONS\n"
+            "• Owner: The Discord Server Owner has full control by default. They can add or remove moderators.\n"
+            "• Moderator: Users added via /addmod, or holding a role added via /addmodrole, can use the /switch command. "
+            "They cannot modify other moderators. Moderators are tracked per server, so access in one server does not carry over to another.\n\n"
+            "5. STREAM CONTROL\n"
+            "• Use '/start_stream' to begin your stream when you're ready to go live. The bot will check if a stream is already running.\n"
+            "• Use '/stop_stream' to end your stream when you're done. The bot will verify the stream status first.\n\n"
+            "6. SCENE SWITCHING\n"
+            "When using the '/switch' command, a list of your current OBS scenes will appear as suggestions. "
+            "Simply select one and the bot will update your stream layout instantly. The bot keeps your scene list "
+            "in sync with OBS, so added, renamed or removed scenes show up right away.\n\n"
+            "7. TROUBLESHOOTING\n"
+            "• If scenes don't appear in the autocomplete, ensure OBS is running with WebSocket server enabled.\n"
+            "• If you get permission errors, verify the user has been properly added as a moderator with /addmod.\n"
+            "• The bot needs 'Send Messages' and 'View Channel' permissions in your Discord server."
+        )
+
+        def add_safety_tips(parent_frame):
+            tips_frame = ctk.CTkFrame(parent_frame, fg_color="gray20", corner_radius=10)
+            tips_frame.pack(fill="x", padx=15, pady=(0, 15))
+            
+            for tip in SAFETY_TIPS:
+                tip_lbl = ctk.CTkLabel(
+                    tips_frame, 
+                    text=tip, 
+                    justify="left", 
+                    wraplength=440, 
+                    font=ctk.CTkFont(size=12, slant="italic"),
+                    text_color="#3b8ed0" 
+                )
+                tip_lbl.pack(padx=10, pady=10)
+
+        ContentWindow(self, "User Guide", content, extra_content_callback=add_safety_tips)
+
+    def open_tos(self):
+        content = (
+            "TERMS OF SERVICE\n\n"
+            "1. ACCEPTANCE OF TERMS\n"
+            f"By accessing or using {APP_NAME} (the Software), you agree to be bound by these Terms of Service. "
+            "If you do not agree to these terms, please do not use the Software.\n\n"
+            "2. LICENSE GRANT\n"
+            f"We grant you a limited, non-exclusive, non-transferable license to use {APP_NAME} for personal "
+            "or community streaming management purposes in accordance with these terms.\n\n"
+            "3. USER RESPONSIBILITIES\n"
+            "• You are responsible for all activities that occur under your Discord bot account.\n"
+            "• You must ensure that your use of the Software complies with all applicable laws and regulations.\n"
+            "• You are responsible for maintaining the confidentiality of your OBS WebSocket password and Discord bot token.\n\n"
+            "4. PROHIBITED USES\n"
+            "You agree not to use the Software to:\n"
+            "• Harass, abuse, or harm others\n"
+            "• Gain unauthorized access to OBS instances you don't own or have permission to manage\n"
+            "• Disrupt or interfere with the security or accessibility of the Software\n"
+            "• Use the Software for any illegal or unauthorized purpose\n\n"
+            "5. LIMITATION OF LIABILITY\n"
+            f"To the maximum extent permitted by law, {APP_NAME} and its developers shall not be liable for any "
+            "indirect, incidental, special, consequential, or punitive damages, or any loss of profits or revenues, "
+            "whether incurred directly or indirectly, or any loss of data, use, goodwill, or other intangible losses, "
+            "resulting from your access to or use of the Software.\n\n"
+            "6. DISCLAIMER OF WARRANTIES\n"
+            "The Software is provided as is without warranties of any kind, whether express or implied, "
+            "including but not limited to implied warranties of merchantability, fitness for a particular purpose, "
+            "or non-infringement.\n\n"
+            "7. CHANGES TO TERMS\n"
+            f"We reserve the right to modify these terms at any time. Your continued use of {APP_NAME} after such "
+            "changes constitutes your acceptance of the new terms."
+        )
+        ContentWindow(self, "Terms of Service", content)
+
+    def open_privacy(self):
+        content = (
+            "PRIVACY POLICY\n\n"
+            "1. INFORMATION WE COLLECT\n"
+            f"{APP_NAME} handles the following types of information:\n\n"
+            "• Discord Bot Token: Required to authenticate with Discord's API.\n"
+            "• OBS WebSocket Password: Required to communicate with your local OBS instance.\n"
+            "• Moderator Information: User IDs and names of Discord users granted moderator permissions.\n\n"
+            "2. HOW WE USE YOUR INFORMATION\n"
+            "• Your Discord Bot Token is used exclusively to authenticate with Discord's API.\n"
+            "• Your OBS WebSocket Password is used only to establish a connection with your local OBS instance.\n"
+            "• Moderator information is used to control access to the bot's functionality.\n\n"
+            "3. DATA STORAGE AND SECURITY\n"
+            f"• All sensitive information is stored securely in encrypted files ({CONFIG_FILE} and {MODERATORS_FILE}) in the application directory.\n"
+            "• The encryption key is dynamically derived from your local hardware and cannot be extracted manually.\n"
+            "• No data is transmitted to our servers or any third parties.\n"
+            "• We recommend the following security practices:\n"
+            f"  - Keep your {CONFIG_FILE} file secure and never share it publicly\n"
+            "  - Use strong, unique passwords for your OBS WebSocket connection\n"
+            "  - Only grant moderator permissions to trusted users\n\n"
+            "4. DATA DELETION\n"
+            "You can delete all stored data by:\n"
+            f"• Deleting the {CONFIG_FILE} and {MODERATORS_FILE} files and the {AUDIT_DIR} folder from the application directory\n"
+            "• Using the /remmod command to remove moderator permissions\n\n"
+            "5. CHILDREN'S PRIVACY\n"
+            f"{APP_NAME} is not intended for use by children under the age of 13. We do not knowingly collect "
+            "personal information from children under 13. If we learn we have collected personal information from "
+            "a child under 13, we will take steps to delete the information as soon as possible.\n\n"
+            "6. CHANGES TO THIS POLICY\n"
+            "We may update our Privacy Policy from time to time. We will notify you of any changes by posting the new "
+            "Privacy Policy in the application. You are advised to review this Privacy Policy periodically for any changes."
+        )
+        ContentWindow(self, "Privacy Policy", content)
+
+    def open_credits(self):
+        win = ContentWindow(self, "Acknowledgements", 
+            "• Discord Dev Portal\n"
+            "• Niels Coert\n"
+            "• OBS Project"
+        )
+        
+        link_frame = ctk.CTkFrame(win.scroll_frame, fg_color="transparent")
+        link_frame.pack(pady=10)
+        
+        links = [
+            ("StreamCast", "https://stream-cast.netlify.app"),
+            ("OBS Project", "https://obsproject.com"),
+            ("Discord Devs", "https://discord.com/developers"),
+            ("GitHub Repo", "https://github.com/The-BitWalker/StreamCast")
+        ]
+        
+        for name, url in links:
+            l_btn = ctk.CTkButton(link_frame, text=name, width=100, command=lambda u=url: webbrowser.open(u))
+            l_btn.pack(side="left", padx=5, pady=5)
+
+class SetupGuideWindow(ctk.CTkToplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Setup Instructions")
+        self.geometry("650x600")
+        self.attributes("-topmost", True)
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.scroll_frame = ctk.CTkScrollableFrame(self, label_text="Step-by-Step Setup")
+        self.scroll_frame.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+
+        self.display_setup_guide()
+
+        self.close_button = ctk.CTkButton(self, text="Got it!", command=self.destroy, width=200)
+        self.close_button.grid(row=1, column=0, pady=15)
+
+    def add_step(self, title, text, link=None, is_warning=False):
+        frame = ctk.CTkFrame(self.scroll_frame, fg_color="gray20" if is_warning else "transparent")
+        frame.pack(fill="x", pady=8, padx=5)
+        
+        title_color = "#ff4444" if is_warning else "#3b8ed0"
+        title_prefix = " " if is_warning else ""
+        
+        title_lbl = ctk.CTkLabel(frame, text=f"{title_prefix}{title}", font=ctk.CTkFont(size=16, weight="bold"), text_color=title_color)
+        title_lbl.pack(anchor="w", padx=10, pady=(5, 2))
+        
+        content_lbl = ctk.CTkLabel(frame, text=text, justify="left", wraplength=550, font=ctk.CTkFont(size=13))
+        content_lbl.pack(anchor="w", pady=(0, 10 if link else 5), padx=10)
+        
+        if link:
+            link_lbl = ctk.CTkLabel(frame, text=" Click here for official instructions", text_color="#1f538d", cursor="hand2", font=ctk.CTkFont(size=13, underline=True))
+            link_lbl.pack(anchor="w", padx=10, pady=(0, 10))
+            link_lbl.bind("<Button-1>", lambda e: webbrowser.open(link))
+
+    def display_setup_guide(self):
+        self.add_step("What is this?", f"We built {APP_NAME} to let your Discord moderators control your OBS scenes. It connects your Discord server to your streaming software safely.")
+        self.add_step("1. Create Your Bot", "A Discord Bot is like a virtual assistant for your server. Create one in our recommended portal.", "https://discord.com/developers/applications")
+        self.add_step("2. Get Your Secret Token", "In the Bot section, click 'Reset Token' to see your password. Keep it secret!")
+        self.add_step("3. Invite the Bot", "Go to OAuth2 -> URL Generator. Check 'bot' and 'applications.commands'.")
+        self.add_step("4. Install OBS WebSocket", "OBS 28+ has this built-in. Check Tools -> WebSocket Server Settings.", "https://obsproject.com/forum/resources/obs-websocket-remote-control-of-obs-studio-from-websockets.466/")
+        self.add_step("SECURITY WARNING", "Never share your Bot Token or OBS Password with anyone.", is_warning=True)
+
+class ControlPanel(ctk.CTkToplevel):
+    def __init__(self, master, settings):
+        super().__init__(master)
+        self.settings = settings
+        
+        self.title(f"{APP_NAME} - Active")
+        self.geometry("400x590")
+        self.resizable(False, False)
+        
+        self.after(10, self.center_window)
+        
+        self.grid_columnconfigure(0, weight=1)
+
+        self.header_label = ctk.CTkLabel(self, text="StreamCast", font=ctk.CTkFont(size=20, weight="bold"))
+        self.header_label.pack(pady=(30, 10))
+
+        self.bot_identity_label = ctk.CTkLabel(self, text="Bot: Not Connected", font=ctk.CTkFont(size=14, weight="bold"), text_color="gray")
+        self.bot_identity_label.pack(pady=5)
+
+        self.status_label = ctk.CTkLabel(self, text="Status: Connecting...", text_color="orange", font=ctk.CTkFont(size=13))
+        self.status_label.pack(pady=5)
+
+        self.obs_label = ctk.CTkLabel(self, text="OBS: Waiting...", text_color="gray", font=ctk.CTkFont(size=12))
+        self.obs_label.pack(pady=(0, 5))
+
+        self.shard_label = ctk.CTkLabel(self, text="", text_color="gray", font=ctk.CTkFont(size=12), wraplength=360)
+        self.shard_label.pack(pady=(0, 5))
+
+        self.feed_box = ctk.CTkTextbox(self, height=150, font=ctk.CTkFont(size=11), state="disabled")
+        self.feed_box.pack(padx=20, pady=(10, 0), fill="x")
+
+        self.btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.btn_frame.pack(pady=20)
+
+        self.about_btn = ctk.CTkButton(self.btn_frame, text=" About & Info", command=self.open_about, fg_color="#1f538d", width=160)
+        self.about_btn.pack(pady=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.hide_window)
+
+        self.bot = None
+        self.obs_states = {}
+        self.ui = UiBridge()
+        self.after(UI_TICK_MS, self.drain_ui)
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.start_async_loop, daemon=True).start()
+
+        self.tray_icon = None
+        threading.Thread(target=self.setup_tray, daemon=True).start()
+
+    def create_tray_image(self):
+        width = 64
+        height = 64
+        image = Image.new('RGB', (width, height), color=(31, 83, 141)) # Blue background
+        dc = ImageDraw.Draw(image)
+        dc.rectangle([width // 4, height // 4, width * 3 // 4, height * 3 // 4], fill=(255, 255, 255))
+        return image
+
+    def setup_tray(self):
+        menu = (
+            item('Restore Window', self.show_window, default=True),
+            item('Quit Completely', self.quit_application)
+        )
+        self.tray_icon = pystray.Icon("StreamCast", self.create_tray_image(), "StreamCast - Active", menu)
+        self.tray_icon.run()
+
+    def hide_window(self):
+        self.withdraw()
+
+    def show_window(self, icon=None, item=None):
+        self.deiconify()
+        self.lift()
+        self.focus_force()
+
+    def quit_application(self, icon=None, item=None):
+        if self.tray_icon:
+            self.tray_icon.stop()
+        self.master.destroy()
+        sys.exit(0)
+
+    def center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+    def open_about(self):
+        AboutWindow(self)
+
+    def update_status(self, text, color, identity=None):
+        self.status_label.configure(text=text, text_color=color)
+        if identity:
+            self.bot_identity_label.configure(text=identity, text_color="white")
+
+    def drain_ui(self):
+        # Runs on the Tk thread; the bot thread only ever touches self.ui
+        update = self.ui.drain()
+        if STATUS in update:
+            status = update[STATUS]
+            self.update_status(status["text"], status["color"], status["identity"])
+        if OBS in update:
+            self.obs_states.update(update[OBS])
+            connected = sum(state["connected"] for state in self.obs_states.values())
+            color = "green" if connected == len(self.obs_states) else "orange" if connected else "#ff4444"
+            names = " · ".join(f"{name} {state['detail']}" for name, state in self.obs_states.items())
+            self.obs_label.configure(text=f"OBS: {names}", text_color=color)
+        if SHARDS in update:
+            shards = [f"#{shard_id} {'-' if latency is None else f'{latency * 1000:.0f} ms'} · {guilds} guilds"
+                      for shard_id, latency, guilds in update[SHARDS]]
+            self.shard_label.configure(text="Shards: " + ", ".join(shards) if shards else "")
+        if FEED in update:
+            self.feed_box.configure(state="normal")
+            self.feed_box.insert("end", "\n".join(update[FEED]) + "\n")
+            lines = int(self.feed_box.index("end-1c").split(".")[0])
+            if lines > self.ui.feed_size:
+                self.feed_box.delete("1.0", f"{lines - self.ui.feed_size}.0")
+            self.feed_box.see("end")
+            self.feed_box.configure(state="disabled")
+        self.after(UI_TICK_MS, self.drain_ui)
+
+    def start_async_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.bot = create_bot(self.settings, self.master.secret_mgr)
+        self.bot.ui_events = self.ui
+        self.loop.run_until_complete(run_bot(self.bot, self.settings.discord_token))
+
+class App(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        
+        self.secret_mgr = SecretManager()
+        
+        self.title(f"{APP_NAME} {VERSION}")
+        self.geometry("500x520")
+        self.resizable(False, False)
+        
+        self.center_window()
+
+        self.grid_columnconfigure(0, weight=1)
+
+        self.title_label = ctk.CTkLabel(self, text=APP_NAME, font=ctk.CTkFont(size=28, weight="bold"))
+        self.title_label.pack(pady=(40, 5))
+
+        self.tagline_label = ctk.CTkLabel(self, text="Remote Scene Control via Discord", font=ctk.CTkFont(size=14), text_color="gray")
+        self.tagline_label.pack(pady=(0, 30))
+
+        self.input_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.input_frame.pack(padx=50, fill="x")
+
+        self.discord_label = ctk.CTkLabel(self.input_frame, text="Discord Bot Token:", font=ctk.CTkFont(size=13, weight="bold"))
+        self.discord_label.pack(anchor="w", pady=(10, 5))
+        self.discord_entry = ctk.CTkEntry(self.input_frame, placeholder_text="MTE0MzIx...", show="*", height=35)
+        self.discord_entry.pack(fill="x")
+
+        self.obs_label = ctk.CTkLabel(self.input_frame, text="OBS WebSocket Password:", font=ctk.CTkFont(size=13, weight="bold"))
+        self.obs_label.pack(anchor="w", pady=(15, 5))
+        self.obs_entry = ctk.CTkEntry(self.input_frame, placeholder_text="YourPassword123", show="*", height=35)
+        self.obs_entry.pack(fill="x")
+
+        self.message_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12))
+        self.message_label.pack(pady=10)
+
+        self.submit_button = ctk.CTkButton(self, text="Start StreamCast", command=self.submit_event, font=ctk.CTkFont(size=14, weight="bold"), height=40)
+        self.submit_button.pack(pady=10)
+
+        self.guide_button = ctk.CTkButton(self, text="How to get these?", command=self.open_guide, fg_color="gray25", hover_color="gray35")
+        self.guide_button.pack(pady=5)
+
+        self.info_button = ctk.CTkButton(self, text="About & Privacy", command=self.open_about, fg_color="transparent", text_color="gray", hover_color="gray20")
+        self.info_button.pack(side="bottom", pady=15)
+
+        self.stored_token = ""
+        self.stored_obs_pwd = ""
+        self.load_settings()
+
+        threading.Thread(target=self.check_for_updates, daemon=True).start()
+
+    def center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+
+    def check_for_updates(self):
+        try:
+            import requests
+            r = requests.get(VERSION_URL, timeout=5)
+            if r.status_code == 200:
+                remote_ver = r.text.strip()
+                if remote_ver != VERSION:
+                    self.after(2000, lambda: self.show_update_notice(remote_ver))
+        except Exception:
+            pass
+
+    def show_update_notice(self, new_ver):
+        notice = ctk.CTkToplevel(self)
+        notice.title("Update Available")
+        notice.geometry("350x180")
+        notice.attributes("-topmost", True)
+        
+        lbl = ctk.CTkLabel(notice, text=f"A new version is available: {new_ver}\n(Current: {VERSION})", wraplength=300)
+        lbl.pack(pady=20)
+        
+        btn = ctk.CTkButton(notice, text="Download Update", command=lambda: webbrowser.open(UPDATE_URL))
+        btn.pack(pady=10)
+
+    def open_guide(self):
+        SetupGuideWindow(self)
+
+    def open_about(self):
+        AboutWindow(self)
+
+    def load_settings(self):
+        self.settings = load_config(self.secret_mgr)
+        self.stored_token = self.settings.discord_token
+        self.stored_obs_pwd = self.settings.obs_password
+        
+        if self.stored_token:
+            self.discord_entry.insert(0, self.stored_token)
+        if self.stored_obs_pwd:
+            self.obs_entry.insert(0, self.stored_obs_pwd)
+        
+        if self.stored_token:
+            self.message_label.configure(text="Stored credentials found. Starting...", text_color="gray")
+            self.after(100, self.open_control_panel)
+
+    def save_settings(self, token, password):
+        self.settings.update(discord_token=token, obs_password=password)
+        return save_config(self.settings, self.secret_mgr)
+
+    def open_control_panel(self):
+        self.withdraw()
+        self.control_panel = ControlPanel(self, self.settings)
+
+    def submit_event(self):
+        d_token = self.discord_entry.get().strip()
+        o_pwd = self.obs_entry.get().strip()
+        if not d_token:
+            self.message_label.configure(text="Error: Discord Token is required!", text_color="#ff4444")
+            return
+        if self.save_settings(d_token, o_pwd):
+            self.stored_token, self.stored_obs_pwd = d_token, o_pwd
+            self.message_label.configure(text="Success! Starting host...", text_color="green")
+            self.after(500, self.open_control_panel)
+        else:
+            self.message_label.configure(text="Error: Could not save settings", text_color="#ff4444")
@@ -0,0 +1,103 @@
+import json
+import os
+
+from obs_session import BATCH_SERIAL_REALTIME, BATCH_SERIAL_FRAME, BATCH_PARALLEL
+
+EXECUTION_TYPES = {
+    "serial_realtime": BATCH_SERIAL_REALTIME,
+    "serial_frame": BATCH_SERIAL_FRAME,
+    "parallel": BATCH_PARALLEL,
+}
+
+# Macros may contain Sleep steps, so they get more time than a single request
+MACRO_TIMEOUT = 25.0
+
+class MacroError(Exception):
+    # A batch in which at least one step failed or was skipped
+    pass
+
+class Macro:
+    __slots__ = ("name", "requests", "execution_type", "halt_on_failure")
+
+    def __init__(self, name, requests, execution_type=BATCH_SERIAL_REALTIME, halt_on_failure=True):
+        self.name = name
+        self.requests = requests
+        self.execution_type = execution_type
+        self.halt_on_failure = halt_on_failure
+
+    @classmethod
+    def from_dict(cls, name, data):
+        requests = []
+        for step in data["steps"]:
+            request = {"requestType": str(step["requestType"])}
+            if step.get("requestData"):
+                request["requestData"] = dict(step["requestData"])
+            requests.append(request)
+        if not requests:
+            raise ValueError("macro has no steps")
+        execution = data.get("execution", "serial_realtime")
+        if execution not in EXECUTION_TYPES:
+            raise ValueError(f"unknown execution type '{execution}'")
+        return cls(name, requests, EXECUTION_TYPES[execution], bool(data.get("halt_on_failure", True)))
+
+    def summarize(self, results):
+        # What ran; raises MacroError describing the failures if any step did not succeed
+        failures = []
+        for i, result in enumerate(results):
+            status = result.get("requestStatus", {})
+            if not status.get("result"):
+                failure = f"step {i + 1} ({result.get('requestType')}) failed with code {status.get('code')}"
+                if status.get("comment"):
+                    failure += f": {status['comment']}"
+                failures.append(failure)
+        skipped = len(self.requests) - len(results)
+        if skipped > 0:
+            failures.append(f"{skipped} later step(s) skipped")
+        if failures:
+            raise MacroError("; ".join(failures))
+        return f"{len(results)} step(s) ran"
+
+class MacroStore:
+    # Owner-defined macros read from a local JSON file:
+    #   {"intro": {"execution": "serial_realtime", "halt_on_failure": true,
+    #              "steps": [{"requestType": "SetCurrentProgramScene",
+    #                         "requestData": {"sceneName": "Intro"}}, ...]}}
+    # The file is re-read when its modification time changes, so edits apply
+    # without a restart. names/version let a SceneIndex autocomplete over it.
+    def __init__(self, path):
+        self.path = path
+        self.macros = {}
+        self.names = []
+        self.version = 0
+        self._mtime = None
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+
+        macros = {}
+        if mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    definitions = json.load(f)
+            except (IOError, ValueError) as e:
+                print(f"Could not read macros from {self.path}: {e}")
+                return
+            for name, data in definitions.items():
+                try:
+                    macros[name] = Macro.from_dict(name, data)
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    print(f"Ignoring macro '{name}': {e}")
+
+        self.macros = macros
+        self.names = list(macros)
+        self.version += 1
+
+    def get(self, name):
+        self.refresh()
+        return self.macros.get(name)
@@ -0,0 +1,175 @@
+import bisect
+import contextvars
+import functools
+import os
+import sys
+import time
+from collections import defaultdict
+
+from aiohttp import web
+
+# Upper bounds in seconds, shared by every histogram
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+BACKGROUND = "background"
+
+# (command name, start time) of the command running in the current task
+current_command = contextvars.ContextVar("current_command", default=None)
+
+def process_rss():
+    # Current resident set size in bytes, or the peak where only that is known
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Histogram:
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        # Interpolated inside the bucket, like Prometheus' histogram_quantile
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+class Metrics:
+    # Counters and latency histograms kept as plain dicts of ints, cheap
+    # enough to leave on during live shows.
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.latency = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.gauges = {}
+        self._runner = None
+
+    def _command(self):
+        running = current_command.get()
+        return running[0] if running else BACKGROUND
+
+    def observe(self, command, phase, seconds):
+        self.latency[(command, phase)].observe(seconds)
+
+    def observe_current(self, phase, seconds):
+        self.observe(self._command(), phase, seconds)
+
+    def error(self, exc, command=None):
+        self.errors[(command or self._command(), type(exc).__name__)] += 1
+
+    def increment(self, metric, labels, count=1):
+        self.counters[(metric, tuple(sorted(labels.items())))] += count
+
+    def gauge(self, metric, labels, read):
+        # read() is called at scrape time
+        self.gauges[(metric, tuple(sorted(labels.items())))] = read
+
+    def mark_ack(self):
+        running = current_command.get()
+        if running:
+            self.observe(running[0], "ack", time.perf_counter() - running[1])
+
+    def instrument(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                token = current_command.set((name, start))
+                self.calls[name] += 1
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    self.error(e, name)
+                    raise
+                finally:
+                    self.observe(name, "total", time.perf_counter() - start)
+                    current_command.reset(token)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        rows = []
+        for command in sorted(set(self.calls) | {c for c, _ in self.latency}):
+            phases = {phase: hist for (c, phase), hist in self.latency.items() if c == command and hist.count}
+            errors = sum(count for (c, _), count in self.errors.items() if c == command)
+            rows.append((command, self.calls.get(command, 0), errors, phases))
+        return rows
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP streamcast_command_calls_total Slash command and autocomplete invocations.",
+            "# TYPE streamcast_command_calls_total counter",
+        ]
+        for command, count in sorted(self.calls.items()):
+            lines.append(f'streamcast_command_calls_total{{command="{command}"}} {count}')
+
+        lines += [
+            "# HELP streamcast_errors_total Errors by command and exception type.",
+            "# TYPE streamcast_errors_total counter",
+        ]
+        for (command, error), count in sorted(self.errors.items()):
+            lines.append(f'streamcast_errors_total{{command="{command}",error="{error}"}} {count}')
+
+        lines += [
+            "# HELP streamcast_latency_seconds Latency by command and phase (total, ack, done, obs_connect, obs_request, obs_batch).",
+            "# TYPE streamcast_latency_seconds histogram",
+        ]
+        for (command, phase), hist in sorted(self.latency.items()):
+            labels = f'command="{command}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist.counts):
+                cumulative += count
+                lines.append(f'streamcast_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'streamcast_latency_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'streamcast_latency_seconds_sum{{{labels}}} {hist.total}')
+            lines.append(f'streamcast_latency_seconds_count{{{labels}}} {hist.count}')
+
+        for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+            previous = None
+            for (metric, labels), value in sorted(series.items(), key=lambda item: item[0]):
+                if metric != previous:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    previous = metric
+                value = value() if callable(value) else value
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{metric}{{{label_text}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request):
+        return web.Response(text=self.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    async def start_http(self, host="127.0.0.1", port=9464):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+
+STORE_VERSION = 2
+
+# Grants made before moderators were tracked per server. They apply
+# everywhere until adopt_legacy copies them into each server's own list.
+GLOBAL_SCOPE = 0
+
+class GuildAcl:
+    __slots__ = ("users", "roles")
+
+    def __init__(self, users=None, roles=None):
+        self.users = users or {}
+        self.roles = roles or {}
+
+    def __bool__(self):
+        return bool(self.users or self.roles)
+
+    def to_dict(self):
+        data = {}
+        if self.users:
+            data["users"] = {str(user_id): name for user_id, name in self.users.items()}
+        if self.roles:
+            data["roles"] = {str(role_id): name for role_id, name in self.roles.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            {int(user_id): name for user_id, name in data.get("users", {}).items()},
+            {int(role_id): name for role_id, name in data.get("roles", {}).items()},
+        )
+
+class ModeratorStore:
+    # Moderator list kept in memory and written behind. Mutations apply
+    # immediately; disk writes are coalesced, run in a worker thread and land
+    # via temp file + os.replace so a crash never leaves a half-written file.
+    def __init__(self, path, secret_mgr=None, flush_delay=0.5):
+        self.path = path
+        self.secret_mgr = secret_mgr
+        self.flush_delay = flush_delay
+        self.guilds = {}
+        self.writes = 0
+        # Set when an unreadable file could not be moved aside; nothing is written over it
+        self.read_only = False
+        self._dirty = False
+        self._flush_task = None
+        self._flush_lock = None
+
+    @property
+    def temp_path(self):
+        return self.path + ".tmp"
+
+    def acl(self, guild_id):
+        return self.guilds.get(guild_id) or GuildAcl()
+
+    def is_moderator(self, guild_id, member):
+        # Dict lookups per grant list; roles come from the interaction payload
+        acl = self.guilds.get(guild_id)
+        if acl is not None:
+            if member.id in acl.users:
+                return True
+            if acl.roles and any(role.id in acl.roles for role in getattr(member, "roles", ())):
+                return True
+        legacy = self.guilds.get(GLOBAL_SCOPE)
+        return legacy is not None and member.id in legacy.users
+
+    def _read(self, path):
+        if self.secret_mgr:
+            content = self.secret_mgr.decrypt_content(path)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        data = json.loads(content)
+        if data.get("version", 1) < 2:
+            return {GLOBAL_SCOPE: GuildAcl({int(user_id): name for user_id, name in data["moderators"].items()})}
+        return {int(guild_id): GuildAcl.from_dict(acl) for guild_id, acl in data["guilds"].items()}
+
+    def _set_aside(self, path):
+        # Keeps an unreadable file (e.g. encrypted under another hardware ID)
+        # next to the store instead of letting the next flush replace it
+        backup, number = path + ".bak", 1
+        while os.path.exists(backup):
+            number += 1
+            backup = f"{path}.bak{number}"
+        try:
+            os.replace(path, backup)
+        except OSError as e:
+            self.read_only = True
+            print(f"Could not move {path} aside ({e}); moderator changes will not be saved")
+            return path
+        return backup
+
+    def load(self, legacy=None):
+        # Recovery order: the committed file, then a complete temp file left by
+        # a crash between write and rename, then the old MODERATORS= .env line.
+        # An unreadable committed file is kept as .moderators.bak.
+        for path in (self.path, self.temp_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                self.guilds = self._read(path)
+            except (IOError, ValueError, KeyError, AttributeError) as e:
+                if path == self.path:
+                    print(f"Ignoring unreadable moderator file {path}, kept as {self._set_aside(path)}: {e}")
+                else:
+                    print(f"Ignoring unreadable moderator file {path}: {e}")
+                continue
+            if path == self.temp_path:
+                self._write(self._snapshot())
+            return
+
+        if legacy:
+            self.guilds = {GLOBAL_SCOPE: GuildAcl({int(user_id): name for user_id, name in legacy.items()})}
+            self._write(self._snapshot())
+
+    def _snapshot(self):
+        return {str(guild_id): acl.to_dict() for guild_id, acl in self.guilds.items() if acl}
+
+    def _write(self, snapshot):
+        if self.read_only:
+            return
+        data = {"version": STORE_VERSION, "guilds": snapshot}
+        with open(self.temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        if self.secret_mgr:
+            self.secret_mgr.encrypt_file(self.temp_path)
+        os.replace(self.temp_path, self.path)
+        self.writes += 1
+
+    def add_user(self, guild_id, user_id, name):
+        self.guilds.setdefault(guild_id, GuildAcl()).users[user_id] = name
+        self._schedule_flush()
+
+    def remove_user(self, guild_id, user_id):
+        acl = self.guilds.get(guild_id)
+        if acl is None or acl.users.pop(user_id, None) is None:
+            return False
+        self._schedule_flush()
+        return True
+
+    def adopt_legacy(self, guild_ids):
+        # Turns the global grants into per-server ones for the servers the bot
+        # is in now, so each owner can revoke them locally. Servers joined
+        # later start without them.
+        legacy = self.guilds.pop(GLOBAL_SCOPE, None)
+        if not legacy:
+            return False
+        for guild_id in guild_ids:
+            users = self.guilds.setdefault(guild_id, GuildAcl()).users
+            for user_id, name in legacy.users.items():
+                users.setdefault(user_id, name)
+        self._schedule_flush()
+        return True
+
+    def add_role(self, guild_id, role_id, name):
+        self.guilds.setdefault(guild_id, GuildAcl()).roles[role_id] = name
+        self._schedule_flush()
+
+    def remove_role(self, guild_id, role_id):
+        acl = self.guilds.get(guild_id)
+        if acl is None or acl.roles.pop(role_id, None) is None:
+            return False
+        self._schedule_flush()
+        return True
+
+    def _schedule_flush(self):
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            loop = asyncio.get_running_loop()
+            while self._dirty:
+                self._dirty = False
+                write = loop.run_in_executor(None, self._write, self._snapshot())
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # Never leave a write running behind a released lock
+                    await write
+                    raise
+                except OSError as e:
+                    self._dirty = True
+                    print(f"Could not save moderators: {e}")
+                    return False
+        return True
+
+    async def close(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
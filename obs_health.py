@@ -0,0 +1,124 @@
+import asyncio
+import math
+import random
+import time
+
+from obs_session import ObsError, ObsConnectionError
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+
+class ObsOfflineError(ObsConnectionError):
+    pass
+
+class HealthMonitor:
+    # Keeps one OBS link alive in the background. While connected it sends a
+    # cheap GetVersion probe every `interval` seconds and records the round
+    # trip; when the link drops or a probe fails it reconnects with jittered
+    # exponential backoff. It doubles as a circuit breaker: while the link
+    # is down (OPEN), check() fails at once instead of letting every command
+    # wait for its own connection attempt to time out.
+    def __init__(self, session, name, interval=10.0, probe_timeout=2.0, min_backoff=1.0, max_backoff=30.0):
+        self.session = session
+        self.name = name
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.rtt = None
+        self.last_error = None
+        self.retry_at = None
+        self.failures = 0
+        # Called as callback(monitor) on every state change and probe
+        self.on_change = []
+        self._task = None
+        self._wake = None
+        session.on_disconnect.append(self.on_disconnect)
+
+    @property
+    def available(self):
+        return self.state == CLOSED
+
+    def describe(self):
+        if self.available:
+            return "online" if self.rtt is None else f"online, {self.rtt * 1000:.0f} ms"
+        text = f"offline ({self.last_error})" if self.last_error else "offline"
+        if self.retry_at is not None:
+            text += f", retrying in {max(0, math.ceil(self.retry_at - time.monotonic()))}s"
+        return text
+
+    def check(self):
+        if not self.available:
+            raise ObsOfflineError(f"OBS '{self.name}' is {self.describe()}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    def on_disconnect(self, event_data=None):
+        # Open the breaker straight away; the loop reconnects without waiting
+        if self._task is not None and self.available:
+            self._trip(ObsConnectionError("Connection to OBS was lost"))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _changed(self):
+        for callback in self.on_change:
+            callback(self)
+
+    def _trip(self, error):
+        self.failures += 1
+        self.last_error = getattr(error, "comment", None) or str(error)
+        # "Equal jitter": half the exponential delay is fixed, half random
+        delay = min(self.max_backoff, self.min_backoff * 2 ** (self.failures - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        self.retry_at = time.monotonic() + delay
+        self.state = OPEN
+        self.rtt = None
+        self._changed()
+        return delay
+
+    def _reset(self, rtt):
+        self.failures = 0
+        self.last_error = None
+        self.retry_at = None
+        self.state = CLOSED
+        self.rtt = rtt
+        self._changed()
+
+    async def _sleep(self, seconds):
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            if not self.session.connected:
+                try:
+                    await self.session.connect()
+                except ObsError as e:
+                    await asyncio.sleep(self._trip(e))
+                    continue
+
+            start = time.perf_counter()
+            try:
+                await self.session.request("GetVersion", timeout=self.probe_timeout)
+            except ObsError as e:
+                # A link that stops answering is as good as down
+                delay = self._trip(e)
+                await self.session.close()
+                await asyncio.sleep(delay)
+                continue
+            self._reset(time.perf_counter() - start)
+            await self._sleep(self.interval)
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
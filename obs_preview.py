@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import io
+import re
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Thumbnail width in pixels; OBS keeps the aspect ratio
+PREVIEW_WIDTH = 480
+# Seconds a thumbnail is served from memory, and how much memory all of an
+# instance's thumbnails may hold together
+PREVIEW_TTL = 10.0
+PREVIEW_CACHE_BYTES = 8 * 1024 * 1024
+PREVIEW_QUALITY = 80
+PREVIEW_WORKERS = 2
+
+Thumbnail = namedtuple("Thumbnail", "data filename taken")
+
+_pool = None
+# (Image module or None, WebP support), filled in by the first encode so that
+# importing the bot never loads Pillow
+_pillow = None
+
+def _executor():
+    # Separate from the default executor so a burst of previews never holds
+    # up audit or moderator writes; Pillow releases the GIL while encoding
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(PREVIEW_WORKERS, thread_name_prefix="preview")
+    return _pool
+
+def _load_pillow():
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image, features
+            _pillow = (Image, features.check("webp"))
+        except ImportError:
+            _pillow = (None, False)
+    return _pillow
+
+def encode_thumbnail(image_data, width, quality=PREVIEW_QUALITY):
+    # "data:image/png;base64,..." from OBS -> (bytes, extension). Runs on a
+    # preview worker. Without Pillow the PNG from OBS is passed through as is.
+    raw = base64.b64decode(image_data.split(",", 1)[-1])
+    Image, webp = _load_pillow()
+    if Image is None:
+        return raw, "png"
+    with Image.open(io.BytesIO(raw)) as image:
+        image.thumbnail((width, width))
+        out = io.BytesIO()
+        if webp:
+            image.save(out, "WEBP", quality=quality, method=4)
+            return out.getvalue(), "webp"
+        image.save(out, "PNG", optimize=True)
+        return out.getvalue(), "png"
+
+def thumbnail_name(scene, extension):
+    return (re.sub(r"[^A-Za-z0-9_-]+", "_", scene).strip("_") or "scene") + "." + extension
+
+class PreviewCache:
+    # Scene thumbnails for one OBS instance. Entries expire after `ttl`
+    # seconds and the least recently viewed go first once `max_bytes` is
+    # reached. Scene events drop the affected entries, and concurrent
+    # requests for the same scene share one GetSourceScreenshot.
+    def __init__(self, session, width=PREVIEW_WIDTH, ttl=PREVIEW_TTL, max_bytes=PREVIEW_CACHE_BYTES, metrics=None, name=None):
+        self.session = session
+        self.width = width
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self.name = name
+        self.size = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._program = None
+
+    def attach(self, session):
+        session.on_disconnect.append(self.clear)
+        session.on("CurrentProgramSceneChanged", self.on_current_program_scene_changed)
+        session.on("SceneRemoved", self.on_scene_changed)
+        session.on("SceneNameChanged", lambda data: self.invalidate(data["oldSceneName"]))
+        session.on("SceneItemCreated", self.on_scene_changed)
+        session.on("SceneItemRemoved", self.on_scene_changed)
+        session.on("SceneItemEnableStateChanged", self.on_scene_changed)
+        session.on("CurrentSceneCollectionChanged", self.clear)
+
+    def _count(self, result):
+        if self.metrics is not None:
+            self.metrics.increment("streamcast_preview_cache_total", {"instance": self.name, "result": result})
+
+    def cached(self, scene):
+        entry = self._entries.get(scene)
+        if entry is None or time.monotonic() - entry.taken >= self.ttl:
+            return None
+        self._entries.move_to_end(scene)
+        self._count("hit")
+        return entry
+
+    async def get(self, scene):
+        entry = self.cached(scene)
+        if entry is not None:
+            return entry
+        task = self._pending.get(scene)
+        if task is None:
+            self._count("miss")
+            task = self._pending[scene] = asyncio.ensure_future(self._fetch(scene))
+
+            def forget(_):
+                if self._pending.get(scene) is task:
+                    del self._pending[scene]
+            task.add_done_callback(forget)
+        else:
+            self._count("joined")
+        return await asyncio.shield(task)
+
+    async def _fetch(self, scene):
+        taken = time.monotonic()
+        response = await self.session.request("GetSourceScreenshot", {
+            "sourceName": scene, "imageFormat": "png", "imageWidth": self.width,
+        })
+        data, extension = await asyncio.get_running_loop().run_in_executor(
+            _executor(), encode_thumbnail, response["imageData"], self.width)
+        thumbnail = Thumbnail(data, thumbnail_name(scene, extension), taken)
+        # A scene event while this was in flight unlisted it; the image may be stale
+        if self._pending.get(scene) is asyncio.current_task():
+            self._store(scene, thumbnail)
+        return thumbnail
+
+    def _store(self, scene, thumbnail):
+        if len(thumbnail.data) > self.max_bytes:
+            return
+        self._drop(scene)
+        self._entries[scene] = thumbnail
+        self.size += len(thumbnail.data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.data)
+            self._count("evicted")
+
+    def _drop(self, scene):
+        entry = self._entries.pop(scene, None)
+        if entry is not None:
+            self.size -= len(entry.data)
+
+    def invalidate(self, scene):
+        self._drop(scene)
+        self._pending.pop(scene, None)
+
+    def clear(self, event_data=None):
+        self._entries.clear()
+        self._pending.clear()
+        self.size = 0
+
+    def on_scene_changed(self, data):
+        self.invalidate(data["sceneName"])
+
+    def on_current_program_scene_changed(self, data):
+        # Sources restart when a scene goes on or off air
+        if self._program is not None:
+            self.invalidate(self._program)
+        self._program = data["sceneName"]
+        self.invalidate(self._program)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import time
+import weakref
+from collections import namedtuple
+
+from obs_session import ObsSession, EVENT_CONFIG, EVENT_SCENES, EVENT_OUTPUTS, EVENT_SCENE_ITEMS
+from obs_scheduler import ObsScheduler
+from obs_health import HealthMonitor
+from obs_stats import StatsSampler
+from obs_preview import PreviewCache, PREVIEW_WIDTH
+from obs_state import SceneModel, OutputModel, SceneItemModel
+from scene_index import SceneIndex
+
+DEFAULT_INSTANCE = "main"
+ALL_TARGETS = "all"
+
+FanOutResult = namedtuple("FanOutResult", "instance message error latency")
+
+class ObsInstance:
+    def __init__(self, name, host="localhost", port=4455, password="", metrics=None, stats_interval=1.0, preview_width=PREVIEW_WIDTH):
+        self.name = name
+        self.session = ObsSession(host=host, port=port, password=password,
+                                  event_subscriptions=EVENT_SCENES | EVENT_CONFIG | EVENT_OUTPUTS | EVENT_SCENE_ITEMS, metrics=metrics)
+        self.scenes = SceneModel()
+        self.scenes.attach(self.session)
+        self.outputs = OutputModel()
+        self.outputs.attach(self.session)
+        self.scene_index = SceneIndex(self.scenes)
+        self.scene_items = SceneItemModel()
+        self.scene_items.attach(self.session)
+        self._source_indexes = weakref.WeakKeyDictionary()
+        self.scheduler = ObsScheduler(self.session, metrics=metrics, name=name)
+        self.health = HealthMonitor(self.session, name)
+        self.stats = StatsSampler(self.session, self.health, stats_interval)
+        self.previews = PreviewCache(self.session, preview_width, metrics=metrics, name=name)
+        self.previews.attach(self.session)
+        if metrics is not None:
+            metrics.gauge("streamcast_obs_queue_depth", {"instance": name}, lambda: self.scheduler.depth)
+            metrics.gauge("streamcast_obs_up", {"instance": name}, lambda: int(self.health.available and self.session.connected))
+
+    def source_index(self, items):
+        # Autocomplete index over one scene's sources; goes away with the item list
+        index = self._source_indexes.get(items)
+        if index is None:
+            index = self._source_indexes[items] = SceneIndex(items)
+        return index
+
+    def ensure_connected(self):
+        # The health monitor connects in the background and keeps the link
+        # alive; the scene model loads itself once identified
+        self.health.start()
+        self.stats.start()
+
+class ObsRegistry:
+    # Named OBS endpoints, each with its own persistent session. The first
+    # registered instance is the default target for commands.
+    def __init__(self, metrics=None, stats_interval=1.0, preview_width=PREVIEW_WIDTH):
+        self.metrics = metrics
+        self.stats_interval = stats_interval
+        self.preview_width = preview_width
+        self.instances = {}
+        self.default = None
+
+    def add(self, name, host="localhost", port=4455, password=""):
+        instance = ObsInstance(name, host, port, password, self.metrics, self.stats_interval, self.preview_width)
+        self.instances[name] = instance
+        if self.default is None:
+            self.default = instance
+        return instance
+
+    def load(self, path):
+        # Optional plain JSON file, like macros.json:
+        #   {"backup": {"host": "10.0.0.2", "port": 4455, "password": "..."}}
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                endpoints = json.load(f)
+        except (IOError, ValueError) as e:
+            print(f"Could not read OBS instances from {path}: {e}")
+            return
+        for name, endpoint in endpoints.items():
+            if name.lower() == ALL_TARGETS or name in self.instances:
+                continue
+            self.add(name, endpoint.get("host", "localhost"), int(endpoint.get("port", 4455)), endpoint.get("password", ""))
+
+    def names(self):
+        return list(self.instances)
+
+    def resolve(self, target=None):
+        if not target:
+            return [self.default]
+        if target.lower() == ALL_TARGETS:
+            return list(self.instances.values())
+        if target not in self.instances:
+            raise KeyError(target)
+        return [self.instances[target]]
+
+    def ensure_connected(self):
+        for instance in self.instances.values():
+            instance.ensure_connected()
+
+    async def fan_out(self, instances, action):
+        # Runs action(instance) on every instance at once; failures are reported, not raised
+        async def timed(instance):
+            start = time.perf_counter()
+            try:
+                message = await action(instance)
+                error = None
+            except Exception as e:
+                message, error = None, e
+                if self.metrics is not None:
+                    self.metrics.error(e)
+            return FanOutResult(instance, message, error, time.perf_counter() - start)
+
+        return await asyncio.gather(*(timed(instance) for instance in instances))
+
+    async def close(self):
+        await asyncio.gather(*(instance.stats.stop() for instance in self.instances.values()))
+        await asyncio.gather(*(instance.health.stop() for instance in self.instances.values()))
+        await asyncio.gather(*(instance.scheduler.close() for instance in self.instances.values()))
+        await asyncio.gather(*(instance.session.close() for instance in self.instances.values()))
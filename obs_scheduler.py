@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import deque, namedtuple
+
+# What happened to a queued request, as told to the caller that submitted it
+RAN = "ran"
+MERGED = "merged"
+SUPERSEDED = "superseded"
+
+Outcome = namedtuple("Outcome", "status result")
+
+SWITCH = "switch"
+
+class _Operation:
+    __slots__ = ("kind", "key", "action", "waiters", "started")
+
+    def __init__(self, kind, key, action):
+        self.kind = kind
+        self.key = key
+        self.action = action
+        self.waiters = []
+        self.started = False
+
+class ObsScheduler:
+    # Per-instance command queue. Operations run one at a time in arrival
+    # order, with two exceptions for bursts:
+    #  - consecutive scene switches that have not started yet collapse into
+    #    the newest one (last writer wins); callers that asked for another
+    #    scene are told they were superseded
+    #  - a serialized operation (start/stop) joins an identical one that is
+    #    queued or running instead of running twice
+    # After a switch, the next one is held for `window` seconds so that a
+    # burst reaches OBS as a single transition.
+    def __init__(self, session, window=0.1, metrics=None, name=None):
+        self.session = session
+        self.window = window
+        self.metrics = metrics
+        self.name = name
+        self._queue = deque()
+        self._current = None
+        self._worker = None
+        self._last_switch = 0.0
+
+    @property
+    def depth(self):
+        return len(self._queue) + (1 if self._current is not None else 0)
+
+    @property
+    def switch_pending(self):
+        # A switch is queued or on its way to OBS, so the current scene is about to change
+        return any(operation.kind == SWITCH for operation in self._queue) or (
+            self._current is not None and self._current.kind == SWITCH)
+
+    def _count(self, status, count=1):
+        if self.metrics is not None and count:
+            self.metrics.increment("streamcast_obs_scheduled_total", {"instance": self.name, "outcome": status}, count)
+
+    def _wait(self, operation):
+        future = asyncio.get_running_loop().create_future()
+        operation.waiters.append(future)
+        return future
+
+    async def switch_scene(self, scene):
+        action = lambda: self.session.request("SetCurrentProgramScene", {"sceneName": scene})
+        tail = self._queue[-1] if self._queue else None
+        if tail is not None and tail.kind == SWITCH and not tail.started:
+            if tail.key != scene:
+                for waiter in tail.waiters:
+                    if not waiter.done():
+                        waiter.set_result(Outcome(SUPERSEDED, None))
+                self._count(SUPERSEDED, len(tail.waiters))
+                tail.waiters = []
+                tail.key = scene
+                tail.action = action
+            return await self._wait(tail)
+        return await self._enqueue(_Operation(SWITCH, scene, action))
+
+    async def serialized(self, key, action):
+        # Joins a queued or running operation with the same key
+        for operation in ([self._current] if self._current is not None else []) + list(self._queue):
+            if operation.kind != SWITCH and operation.key == key:
+                return await self._wait(operation)
+        return await self._enqueue(_Operation(key, key, action))
+
+    def _enqueue(self, operation):
+        future = self._wait(operation)
+        self._queue.append(operation)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._work())
+        return future
+
+    async def _work(self):
+        while self._queue:
+            operation = self._queue[0]
+            if operation.kind == SWITCH:
+                # Held in the queue, so later switches can still merge into it
+                delay = self._last_switch + self.window - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._queue.popleft()
+
+            waiters = [w for w in operation.waiters if not w.done()]
+            if not waiters:
+                continue
+            operation.started = True
+            self._current = operation
+            try:
+                result = await operation.action()
+            except Exception as e:
+                for waiter in operation.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                # A merged switch ran on behalf of its newest caller, a
+                # deduplicated operation on behalf of its first
+                runner = operation.waiters[-1 if operation.kind == SWITCH else 0]
+                for waiter in operation.waiters:
+                    if not waiter.done():
+                        waiter.set_result(Outcome(RAN if waiter is runner else MERGED, result))
+                self._count(RAN)
+                self._count(MERGED, len(operation.waiters) - 1)
+            finally:
+                self._current = None
+                if operation.kind == SWITCH:
+                    self._last_switch = time.monotonic()
+
+    async def close(self):
+        pending = list(self._queue)
+        if self._current is not None:
+            pending.append(self._current)
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        for operation in pending:
+            for waiter in operation.waiters:
+                if not waiter.done():
+                    waiter.cancel()
+        self._queue.clear()
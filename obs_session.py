@@ -0,0 +1,251 @@
+import asyncio
+import base64
+import hashlib
+import inspect
+import itertools
+import json
+import time
+
+import aiohttp
+
+# OBS WebSocket v5 opcodes
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_REIDENTIFY = 3
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_REQUEST_RESPONSE = 7
+OP_REQUEST_BATCH = 8
+OP_REQUEST_BATCH_RESPONSE = 9
+
+RPC_VERSION = 1
+
+# RequestBatch execution types
+BATCH_SERIAL_REALTIME = 0
+BATCH_SERIAL_FRAME = 1
+BATCH_PARALLEL = 2
+
+# Event subscription bits sent with Identify
+EVENT_GENERAL = 1 << 0
+EVENT_CONFIG = 1 << 1
+EVENT_SCENES = 1 << 2
+EVENT_INPUTS = 1 << 3
+EVENT_TRANSITIONS = 1 << 4
+EVENT_FILTERS = 1 << 5
+EVENT_OUTPUTS = 1 << 6
+EVENT_SCENE_ITEMS = 1 << 7
+EVENT_MEDIA_INPUTS = 1 << 8
+EVENT_VENDORS = 1 << 9
+EVENT_UI = 1 << 10
+
+class ObsError(Exception):
+    def __init__(self, request_type, code=None, comment=None):
+        self.request_type = request_type
+        self.code = code
+        self.comment = comment
+        message = f"{request_type} failed"
+        if code is not None:
+            message += f" (code {code})"
+        if comment:
+            message += f": {comment}"
+        super().__init__(message)
+
+class ObsConnectionError(ObsError):
+    def __init__(self, comment):
+        super().__init__("Connection", comment=comment)
+
+def build_auth(password, salt, challenge):
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode()).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode()).digest()).decode()
+
+class ObsSession:
+    # One authenticated OBS WebSocket connection shared by every command.
+    # Requests are tagged with a requestId and answered out of order by a
+    # single reader task, so concurrent callers never wait on each other.
+    def __init__(self, host="localhost", port=4455, password="", timeout=5.0, event_subscriptions=0, metrics=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.event_subscriptions = event_subscriptions
+        self.metrics = metrics
+        self._http = None
+        self._ws = None
+        self._reader = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = None
+        self._event_handlers = {}
+        self.on_connect = []
+        self.on_disconnect = []
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    @property
+    def connected(self):
+        return self._ws is not None and not self._ws.closed
+
+    def on(self, event_type, callback):
+        self._event_handlers.setdefault(event_type, []).append(callback)
+
+    def _fire(self, callback, *args):
+        try:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+        except Exception as e:
+            print(f"OBS event handler error: {e}")
+
+    async def connect(self):
+        if self.connected:
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._open(), self.timeout)
+                if self.metrics is not None:
+                    self.metrics.observe_current("obs_connect", time.perf_counter() - start)
+            except asyncio.TimeoutError:
+                await self._discard()
+                raise ObsConnectionError(f"Timed out connecting to {self.url}")
+            except (aiohttp.ClientError, OSError) as e:
+                await self._discard()
+                raise ObsConnectionError(f"Could not reach {self.url} ({e})")
+            except ObsError:
+                await self._discard()
+                raise
+
+    async def _open(self):
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession()
+        self._ws = await self._http.ws_connect(self.url, protocols=("obswebsocket.json",), max_msg_size=0)
+
+        hello = await self._receive_json()
+        if hello.get("op") != OP_HELLO:
+            raise ObsConnectionError("Unexpected handshake from OBS")
+
+        identify = {"rpcVersion": RPC_VERSION, "eventSubscriptions": self.event_subscriptions}
+        auth = hello["d"].get("authentication")
+        if auth:
+            identify["authentication"] = build_auth(self.password or "", auth["salt"], auth["challenge"])
+        await self._ws.send_json({"op": OP_IDENTIFY, "d": identify})
+
+        identified = await self._receive_json()
+        if identified.get("op") != OP_IDENTIFIED:
+            raise ObsConnectionError("OBS rejected the identify message")
+
+        self._reader = asyncio.ensure_future(self._read_loop(self._ws))
+        for callback in self.on_connect:
+            self._fire(callback)
+
+    async def _receive_json(self):
+        msg = await self._ws.receive()
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            return json.loads(msg.data)
+        if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
+            code = self._ws.close_code
+            if code == 4009:
+                raise ObsConnectionError("Authentication failed, check the OBS WebSocket password")
+            raise ObsConnectionError(f"OBS closed the connection (code {code})")
+        raise ObsConnectionError(f"Unexpected message from OBS: {msg.type}")
+
+    async def _read_loop(self, ws):
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(msg.data)
+                except ValueError:
+                    continue
+                self._dispatch(payload)
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            self._fail_pending(ObsConnectionError("Connection to OBS was lost"))
+            for callback in self.on_disconnect:
+                self._fire(callback)
+
+    def _dispatch(self, payload):
+        op = payload.get("op")
+        data = payload.get("d", {})
+        if op in (OP_REQUEST_RESPONSE, OP_REQUEST_BATCH_RESPONSE):
+            future = self._pending.get(data.get("requestId"))
+            if future is not None and not future.done():
+                future.set_result(data)
+        elif op == OP_EVENT:
+            for callback in self._event_handlers.get(data.get("eventType"), ()):
+                self._fire(callback, data.get("eventData") or {})
+
+    def _fail_pending(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _send(self, op, data, timeout):
+        await self.connect()
+        ws = self._ws
+        if ws is None:
+            raise ObsConnectionError("Connection to OBS was lost")
+        request_id = str(next(self._ids))
+        data["requestId"] = request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await ws.send_json({"op": op, "d": data})
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise ObsConnectionError("OBS did not answer in time")
+        except (aiohttp.ClientError, ConnectionResetError):
+            raise ObsConnectionError("Connection to OBS was lost")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def request(self, request_type, request_data=None, timeout=None):
+        data = {"requestType": request_type}
+        if request_data:
+            data["requestData"] = request_data
+        start = time.perf_counter()
+        response = await self._send(OP_REQUEST, data, timeout)
+        if self.metrics is not None:
+            self.metrics.observe_current("obs_request", time.perf_counter() - start)
+        status = response.get("requestStatus", {})
+        if not status.get("result"):
+            raise ObsError(request_type, status.get("code"), status.get("comment"))
+        return response.get("responseData") or {}
+
+    async def request_batch(self, requests, execution_type=BATCH_SERIAL_REALTIME, halt_on_failure=False, timeout=None):
+        # Several requests in one round trip. Returns the per-request results
+        # in order; with halt_on_failure the list stops at the first failure.
+        data = {
+            "haltOnFailure": halt_on_failure,
+            "executionType": execution_type,
+            "requests": [dict(r) for r in requests],
+        }
+        start = time.perf_counter()
+        response = await self._send(OP_REQUEST_BATCH, data, timeout)
+        if self.metrics is not None:
+            self.metrics.observe_current("obs_batch", time.perf_counter() - start)
+        return response.get("results", [])
+
+    async def _discard(self):
+        ws, self._ws = self._ws, None
+        if ws is not None and not ws.closed:
+            await ws.close()
+
+    async def close(self):
+        await self._discard()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
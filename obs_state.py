@@ -0,0 +1,333 @@
+import asyncio
+
+from obs_session import ObsError
+
+# In-memory mirrors of OBS state, kept current by OBS events so that the
+# command and autocomplete paths can answer without a network round trip.
+
+class SceneModel:
+    def __init__(self):
+        self.names = []
+        self.current_scene = None
+        self.loaded = False
+        self.version = 0
+        self.session = None
+        self._refresh_task = None
+
+    def attach(self, session):
+        self.session = session
+        session.on_connect.append(self.schedule_refresh)
+        session.on_disconnect.append(self.invalidate)
+        session.on("SceneListChanged", self.on_scene_list_changed)
+        session.on("SceneCreated", self.on_scene_created)
+        session.on("SceneRemoved", self.on_scene_removed)
+        session.on("SceneNameChanged", self.on_scene_name_changed)
+        session.on("CurrentProgramSceneChanged", self.on_current_program_scene_changed)
+        session.on("CurrentSceneCollectionChanging", self.invalidate)
+        session.on("CurrentSceneCollectionChanged", self.on_scene_collection_changed)
+
+    def _set_names(self, names):
+        self.names = names
+        self.version += 1
+
+    def load(self, scene_list):
+        self._set_names([s['sceneName'] for s in scene_list.get('scenes', [])])
+        self.current_scene = scene_list.get('currentProgramSceneName')
+        self.loaded = True
+
+    def invalidate(self, event_data=None):
+        self.loaded = False
+        self.current_scene = None
+
+    async def refresh(self):
+        try:
+            self.load(await self.session.request("GetSceneList"))
+        except ObsError as e:
+            print(f"Could not load OBS scenes: {e}")
+
+    def schedule_refresh(self, event_data=None):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self.refresh())
+        return self._refresh_task
+
+    def on_scene_list_changed(self, data):
+        self._set_names([s['sceneName'] for s in data.get('scenes', [])])
+
+    def on_scene_created(self, data):
+        if data.get('isGroup') or data['sceneName'] in self.names:
+            return
+        self._set_names(self.names + [data['sceneName']])
+
+    def on_scene_removed(self, data):
+        if data.get('isGroup') or data['sceneName'] not in self.names:
+            return
+        self._set_names([n for n in self.names if n != data['sceneName']])
+        if self.current_scene == data['sceneName']:
+            self.current_scene = None
+
+    def on_scene_name_changed(self, data):
+        old, new = data['oldSceneName'], data['sceneName']
+        self._set_names([new if n == old else n for n in self.names])
+        if self.current_scene == old:
+            self.current_scene = new
+
+    def on_current_program_scene_changed(self, data):
+        self.current_scene = data['sceneName']
+
+    def on_scene_collection_changed(self, data):
+        self.invalidate()
+        self.schedule_refresh()
+
+    def is_current(self, scene):
+        return self.loaded and self.session.connected and scene == self.current_scene
+
+# Outputs mirrored by OutputModel
+STREAM = "stream"
+RECORD = "record"
+REPLAY_BUFFER = "replay_buffer"
+VIRTUALCAM = "virtualcam"
+
+# Output lifecycle as seen by commands
+STOPPED = "stopped"
+STARTING = "starting"
+ACTIVE = "active"
+RECONNECTING = "reconnecting"
+PAUSED = "paused"
+STOPPING = "stopping"
+
+OUTPUT_STATES = {
+    "OBS_WEBSOCKET_OUTPUT_STARTING": STARTING,
+    "OBS_WEBSOCKET_OUTPUT_STARTED": ACTIVE,
+    "OBS_WEBSOCKET_OUTPUT_RECONNECTING": RECONNECTING,
+    "OBS_WEBSOCKET_OUTPUT_RECONNECTED": ACTIVE,
+    "OBS_WEBSOCKET_OUTPUT_PAUSED": PAUSED,
+    "OBS_WEBSOCKET_OUTPUT_RESUMED": ACTIVE,
+    "OBS_WEBSOCKET_OUTPUT_STOPPING": STOPPING,
+    "OBS_WEBSOCKET_OUTPUT_STOPPED": STOPPED,
+}
+
+OUTPUT_EVENTS = {
+    "StreamStateChanged": STREAM,
+    "RecordStateChanged": RECORD,
+    "ReplayBufferStateChanged": REPLAY_BUFFER,
+    "VirtualcamStateChanged": VIRTUALCAM,
+}
+
+OUTPUT_STATUS_REQUESTS = {
+    STREAM: "GetStreamStatus",
+    RECORD: "GetRecordStatus",
+    REPLAY_BUFFER: "GetReplayBufferStatus",
+    VIRTUALCAM: "GetVirtualCamStatus",
+}
+
+class OutputModel:
+    # Streaming, recording, replay buffer and virtual camera state. Loaded
+    # with one batched status query per connection, then kept current by
+    # the *StateChanged output events. Outputs OBS does not offer (e.g. no
+    # replay buffer configured) are simply absent.
+    def __init__(self):
+        self.states = {}
+        self.loaded = False
+        self.session = None
+        self._refresh_task = None
+
+    def attach(self, session):
+        self.session = session
+        session.on_connect.append(self.schedule_refresh)
+        session.on_disconnect.append(self.invalidate)
+        for event_type, output in OUTPUT_EVENTS.items():
+            session.on(event_type, lambda data, output=output: self.on_state_changed(output, data))
+
+    def load(self, results):
+        states = {}
+        for output, result in zip(OUTPUT_STATUS_REQUESTS, results):
+            if not result.get("requestStatus", {}).get("result"):
+                continue
+            data = result.get("responseData") or {}
+            if not data.get("outputActive"):
+                states[output] = STOPPED
+            elif data.get("outputReconnecting"):
+                states[output] = RECONNECTING
+            elif data.get("outputPaused"):
+                states[output] = PAUSED
+            else:
+                states[output] = ACTIVE
+        self.states = states
+        self.loaded = True
+
+    def invalidate(self, event_data=None):
+        self.loaded = False
+        self.states = {}
+
+    async def refresh(self):
+        requests = [{"requestType": request_type} for request_type in OUTPUT_STATUS_REQUESTS.values()]
+        try:
+            self.load(await self.session.request_batch(requests))
+        except ObsError as e:
+            print(f"Could not load OBS output state: {e}")
+
+    def schedule_refresh(self, event_data=None):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self.refresh())
+        return self._refresh_task
+
+    def on_state_changed(self, output, data):
+        state = OUTPUT_STATES.get(data.get("outputState"))
+        if state is None:
+            state = ACTIVE if data.get("outputActive") else STOPPED
+        self.states[output] = state
+
+    async def state(self, output):
+        # Local answer once loaded; only the first call after connecting waits on OBS
+        if not self.loaded or not self.session.connected:
+            await self.session.connect()
+            await self.schedule_refresh()
+        return self.states.get(output)
+
+    def expect(self, output, state):
+        # Optimistic transition before a start/stop request, so a second
+        # command racing the first sees STARTING/STOPPING right away. The
+        # returned value restores the previous state if the request fails.
+        previous = self.states.get(output)
+        self.states[output] = state
+        return previous
+
+    def restore(self, output, previous, expected):
+        if self.states.get(output) != expected:
+            return
+        if previous is None:
+            self.states.pop(output, None)
+        else:
+            self.states[output] = previous
+
+# OBS request status for a scene, source or scene item that no longer exists
+RESOURCE_NOT_FOUND = 600
+
+class SceneItem:
+    __slots__ = ("item_id", "source", "enabled")
+
+    def __init__(self, item_id, source, enabled):
+        self.item_id = item_id
+        self.source = source
+        self.enabled = enabled
+
+class SceneItems:
+    # One scene's items, topmost first. `names` and `version` have the same
+    # meaning as on SceneModel, so a SceneIndex can search the sources.
+    def __init__(self):
+        self.items = {}
+        self.names = []
+        self.version = 0
+        self._by_source = {}
+
+    def load(self, scene_items):
+        ordered = sorted(scene_items, key=lambda data: -data.get("sceneItemIndex", 0))
+        self.items = {data["sceneItemId"]: SceneItem(data["sceneItemId"], data["sourceName"], data.get("sceneItemEnabled", True))
+                      for data in ordered}
+        self._reindex()
+
+    def _reindex(self):
+        # A source used twice in one scene is toggled through its topmost item
+        by_source = {}
+        for item in self.items.values():
+            by_source.setdefault(item.source, item)
+        self._by_source = by_source
+        self.names = list(by_source)
+        self.version += 1
+
+    def find(self, source):
+        return self._by_source.get(source)
+
+    def add(self, item_id, source, enabled=True):
+        # New items are created on top
+        self.items = {item_id: SceneItem(item_id, source, enabled), **self.items}
+        self._reindex()
+
+    def remove(self, item_id):
+        if self.items.pop(item_id, None) is not None:
+            self._reindex()
+
+    def set_enabled(self, item_id, enabled):
+        item = self.items.get(item_id)
+        if item is not None:
+            item.enabled = enabled
+
+class SceneItemModel:
+    # Scene items per scene. A scene's list is fetched with GetSceneItemList
+    # the first time it is used and then kept current by scene item events,
+    # so showing or hiding a source needs no lookup request. Items nested in
+    # groups are not listed.
+    def __init__(self):
+        self.scenes = {}
+        self.session = None
+        self._loading = {}
+
+    def attach(self, session):
+        self.session = session
+        session.on_disconnect.append(self.invalidate)
+        session.on("SceneItemCreated", self.on_item_created)
+        session.on("SceneItemRemoved", self.on_item_removed)
+        session.on("SceneItemEnableStateChanged", self.on_item_enable_state_changed)
+        session.on("SceneRemoved", lambda data: self.drop(data["sceneName"]))
+        session.on("SceneNameChanged", self.on_scene_name_changed)
+        session.on("CurrentSceneCollectionChanging", self.invalidate)
+
+    def invalidate(self, event_data=None):
+        self.scenes = {}
+        self._loading = {}
+
+    def drop(self, scene):
+        self.scenes.pop(scene, None)
+        self._loading.pop(scene, None)
+
+    def cached(self, scene):
+        return self.scenes.get(scene)
+
+    async def get(self, scene):
+        items = self.scenes.get(scene)
+        if items is not None:
+            return items
+        task = self._loading.get(scene)
+        if task is None:
+            task = self._loading[scene] = asyncio.ensure_future(self._load(scene))
+
+            def forget(_):
+                if self._loading.get(scene) is task:
+                    del self._loading[scene]
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    async def _load(self, scene):
+        response = await self.session.request("GetSceneItemList", {"sceneName": scene})
+        items = SceneItems()
+        items.load(response.get("sceneItems", []))
+        # An event for this scene during the request may be missing from the
+        # list; the load was then unlisted and the next use fetches it again
+        if self._loading.get(scene) is asyncio.current_task():
+            self.scenes[scene] = items
+        return items
+
+    def _changed(self, scene):
+        self._loading.pop(scene, None)
+        return self.scenes.get(scene)
+
+    def on_item_created(self, data):
+        items = self._changed(data["sceneName"])
+        if items is not None:
+            items.add(data["sceneItemId"], data["sourceName"])
+
+    def on_item_removed(self, data):
+        items = self._changed(data["sceneName"])
+        if items is not None:
+            items.remove(data["sceneItemId"])
+
+    def on_item_enable_state_changed(self, data):
+        items = self._changed(data["sceneName"])
+        if items is not None:
+            items.set_enabled(data["sceneItemId"], data["sceneItemEnabled"])
+
+    def on_scene_name_changed(self, data):
+        items = self.scenes.pop(data["oldSceneName"], None)
+        self._loading.pop(data["oldSceneName"], None)
+        if items is not None:
+            self.scenes[data["sceneName"]] = items
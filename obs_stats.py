@@ -0,0 +1,194 @@
+import asyncio
+import math
+import time
+from array import array
+
+from obs_session import ObsError
+
+# (key, label, format) of every sampled value
+FIELDS = (
+    ("fps", "Active FPS", "{:.1f}"),
+    ("render_ms", "Frame render time", "{:.2f} ms"),
+    ("render_skipped", "Render skipped", "{:.2f}%"),
+    ("output_skipped", "Output skipped", "{:.2f}%"),
+    ("cpu", "CPU", "{:.1f}%"),
+    ("memory", "Memory", "{:.0f} MB"),
+    ("bitrate", "Stream bitrate", "{:.0f} kbps"),
+    ("congestion", "Congestion", "{:.1f}%"),
+)
+FIELD_KEYS = tuple(key for key, _, _ in FIELDS)
+
+class RingBuffer:
+    # Fixed-size, array-backed columns of doubles. Appending overwrites the
+    # oldest row, so memory is allocated once up front.
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = columns
+        self.times = array("d", bytes(8 * capacity))
+        self.data = {column: array("d", bytes(8 * capacity)) for column in columns}
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, row):
+        i = self.head
+        self.times[i] = timestamp
+        for column in self.columns:
+            self.data[column][i] = row[column]
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        return (self.head - 1) % self.capacity if self.count else None
+
+    def since(self, timestamp):
+        # Row indices, newest first, no older than timestamp
+        for k in range(self.count):
+            i = (self.head - 1 - k) % self.capacity
+            if self.times[i] < timestamp:
+                return
+            yield i
+
+def _columns():
+    return ("n",) + tuple(f"{key}.{stat}" for key in FIELD_KEYS for stat in ("min", "sum", "max"))
+
+class StatsHistory:
+    # Two resolutions: every sample for `fine_span` seconds, and one
+    # min/avg/max row per `coarse_step` seconds for `coarse_span`. Windows
+    # that fit in the fine ring are answered from it, longer ones from the
+    # coarse ring plus the bucket still being filled.
+    def __init__(self, interval=1.0, fine_span=600, coarse_step=60, coarse_span=86400):
+        self.fine_span = fine_span
+        self.coarse_step = coarse_step
+        # interval 0 turns sampling off; the rings are then only sized, never filled
+        self.fine = RingBuffer(max(1, math.ceil(fine_span / interval)) if interval > 0 else 1, _columns())
+        self.coarse = RingBuffer(max(1, math.ceil(coarse_span / coarse_step)), _columns())
+        self._bucket = None
+        self._pending = None
+
+    def add(self, timestamp, values):
+        row = {"n": 1}
+        for key in FIELD_KEYS:
+            row[f"{key}.min"] = row[f"{key}.sum"] = row[f"{key}.max"] = values[key]
+        self.fine.append(timestamp, row)
+
+        bucket = int(timestamp // self.coarse_step)
+        if bucket != self._bucket:
+            if self._pending is not None:
+                self.coarse.append(self._bucket * self.coarse_step, self._pending)
+            self._bucket, self._pending = bucket, row
+            return
+        pending = self._pending
+        pending["n"] += 1
+        for key in FIELD_KEYS:
+            value = values[key]
+            pending[f"{key}.sum"] += value
+            if value < pending[f"{key}.min"]:
+                pending[f"{key}.min"] = value
+            if value > pending[f"{key}.max"]:
+                pending[f"{key}.max"] = value
+
+    def current(self):
+        i = self.fine.latest()
+        if i is None:
+            return None, None
+        return self.fine.times[i], {key: self.fine.data[f"{key}.sum"][i] for key in FIELD_KEYS}
+
+    def summary(self, seconds, now=None):
+        # {key: (min, avg, max)} over the last `seconds`, or None without samples
+        ring = self.fine if seconds <= self.fine_span else self.coarse
+        rows = list(ring.since((now or time.time()) - seconds))
+        pending = self._pending if ring is self.coarse else None
+        counts = ring.data["n"]
+        total = sum(counts[i] for i in rows) + (pending["n"] if pending else 0)
+        if not total:
+            return None
+
+        result = {}
+        for key in FIELD_KEYS:
+            lows, sums, highs = (ring.data[f"{key}.{stat}"] for stat in ("min", "sum", "max"))
+            low = min((lows[i] for i in rows), default=math.inf)
+            value_sum = sum(sums[i] for i in rows)
+            high = max((highs[i] for i in rows), default=-math.inf)
+            if pending:
+                low = min(low, pending[f"{key}.min"])
+                value_sum += pending[f"{key}.sum"]
+                high = max(high, pending[f"{key}.max"])
+            result[key] = (low, value_sum / total, high)
+        return result
+
+class StatsSampler:
+    # Polls GetStats and GetStreamStatus in one batch every `interval`
+    # seconds while the health monitor reports the link as up. Commands only
+    # ever read the history, never OBS.
+    def __init__(self, session, health, interval=1.0):
+        self.session = session
+        self.health = health
+        self.interval = interval
+        self.history = StatsHistory(interval)
+        self._previous = None
+        self._task = None
+
+    def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        requests = [{"requestType": "GetStats"}, {"requestType": "GetStreamStatus"}]
+        while True:
+            await asyncio.sleep(self.interval)
+            if not (self.health.available and self.session.connected):
+                self._previous = None
+                continue
+            try:
+                results = await self.session.request_batch(requests, timeout=self.interval * 2)
+            except ObsError:
+                continue
+            sample = self._parse(time.time(), results)
+            if sample is not None:
+                self.history.add(*sample)
+
+    def _parse(self, now, results):
+        if len(results) < 2 or not results[0].get("requestStatus", {}).get("result"):
+            return None
+        stats = results[0].get("responseData") or {}
+        stream = (results[1].get("responseData") or {}) if results[1].get("requestStatus", {}).get("result") else {}
+
+        raw = {
+            "render_skipped": stats.get("renderSkippedFrames", 0),
+            "render_total": stats.get("renderTotalFrames", 0),
+            "output_skipped": stats.get("outputSkippedFrames", 0),
+            "output_total": stats.get("outputTotalFrames", 0),
+            "bytes": stream.get("outputBytes", 0) if stream.get("outputActive") else 0,
+        }
+        previous, self._previous = self._previous, (now, raw)
+
+        def delta(key):
+            # Counters restart with OBS or a new stream
+            if previous is None or raw[key] < previous[1][key]:
+                return 0
+            return raw[key] - previous[1][key]
+
+        def percent(skipped, total):
+            frames = delta(total)
+            return 100.0 * delta(skipped) / frames if frames else 0.0
+
+        elapsed = now - previous[0] if previous is not None else 0
+        return now, {
+            "fps": float(stats.get("activeFps", 0.0)),
+            "render_ms": float(stats.get("averageFrameRenderTime", 0.0)),
+            "render_skipped": percent("render_skipped", "render_total"),
+            "output_skipped": percent("output_skipped", "output_total"),
+            "cpu": float(stats.get("cpuUsage", 0.0)),
+            "memory": float(stats.get("memoryUsage", 0.0)),
+            "bitrate": delta("bytes") * 8 / 1000 / elapsed if elapsed > 0 else 0.0,
+            "congestion": 100.0 * float(stream.get("outputCongestion") or 0.0),
+        }
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
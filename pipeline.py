@@ -0,0 +1,118 @@
+import asyncio
+import time
+from collections import namedtuple
+
+import discord
+
+from metrics import current_command
+
+# Seconds a deferred command may spend on OBS work before the moderator is told it timed out
+DEFAULT_TIMEOUT = 15.0
+COMMAND_TIMEOUTS = {
+    "switch": 12.0,
+    "start_stream": 20.0,
+    "stop_stream": 20.0,
+    "macro": 30.0,
+    "preview": 10.0,
+}
+
+# What work() returns when the result carries attachments; a plain string is just the content
+Reply = namedtuple("Reply", "content files")
+
+class CommandPipeline:
+    # Commands that talk to OBS are acknowledged with defer() right away, so
+    # Discord's 3 second deadline only ever covers that call. The OBS work
+    # then runs as its own task and its outcome replaces the "thinking..."
+    # message. Every task is tracked by interaction id so /cancel can stop
+    # it, and none of them wait on each other.
+    def __init__(self, metrics, timeouts=None, default_timeout=DEFAULT_TIMEOUT):
+        self.metrics = metrics
+        self.timeouts = dict(COMMAND_TIMEOUTS if timeouts is None else timeouts)
+        self.default_timeout = default_timeout
+        self.tasks = {}
+        self.interactions = {}
+        # Called as callback(command, interaction, message, ok, seconds) once a result is delivered
+        self.on_finished = []
+
+    @property
+    def in_flight(self):
+        return len(self.tasks)
+
+    async def submit(self, interaction, command, work, on_error=None, ephemeral=False):
+        # work() returns the message (or a Reply) to show; on_error(exc) formats failures
+        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+        self.metrics.mark_ack()
+        task = asyncio.ensure_future(self._run(interaction, command, work, on_error))
+        self.tasks[interaction.id] = task
+        self.interactions[interaction.id] = interaction
+
+        def forget(_):
+            self.tasks.pop(interaction.id, None)
+            self.interactions.pop(interaction.id, None)
+        task.add_done_callback(forget)
+        return task
+
+    async def _run(self, interaction, command, work, on_error):
+        timeout = self.timeouts.get(command, self.default_timeout)
+        start = time.perf_counter()
+        files = ()
+        try:
+            message = await asyncio.wait_for(work(), timeout)
+            if isinstance(message, Reply):
+                message, files = message
+            ephemeral = False
+        except asyncio.CancelledError:
+            message = " Command cancelled before OBS finished."
+            await self._deliver(interaction, command, message, True)
+            self._finished(command, interaction, message, False, start)
+            raise
+        except asyncio.TimeoutError as e:
+            self.metrics.error(e, command)
+            message, ephemeral = f" OBS did not finish within {timeout:.0f} seconds.", True
+        except Exception as e:
+            self.metrics.error(e, command)
+            message, ephemeral = (on_error(e) if on_error else f" Error communicating with OBS: {e}"), True
+
+        await self._deliver(interaction, command, message, ephemeral, files)
+        running = current_command.get()
+        if running:
+            self.metrics.observe(running[0], "done", time.perf_counter() - running[1])
+        self._finished(command, interaction, message, not ephemeral, start)
+
+    def _finished(self, command, interaction, message, ok, start):
+        for callback in self.on_finished:
+            callback(command, interaction, message, ok, time.perf_counter() - start)
+
+    async def _deliver(self, interaction, command, message, ephemeral, files=()):
+        try:
+            if ephemeral:
+                # The deferred reply may be public; keep failures out of the channel
+                await interaction.delete_original_response()
+                await interaction.followup.send(message, ephemeral=True)
+            elif files:
+                await interaction.edit_original_response(content=message, attachments=list(files))
+            else:
+                await interaction.edit_original_response(content=message)
+        except discord.HTTPException as e:
+            print(f"Could not deliver the /{command} result: {e}")
+
+    def cancel(self, guild_id, user_id=None):
+        # Cancels the guild's in-flight commands, or only those `user_id` ran;
+        # returns how many were stopped. A request already sent to OBS still
+        # completes there, only the reply is replaced.
+        cancelled = 0
+        for interaction_id, task in list(self.tasks.items()):
+            interaction = self.interactions.get(interaction_id)
+            if interaction is None or task.done() or interaction.guild_id != guild_id:
+                continue
+            if user_id is not None and interaction.user.id != user_id:
+                continue
+            task.cancel()
+            cancelled += 1
+        return cancelled
+
+    async def close(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict, namedtuple
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+# `burst` commands per `period` seconds, refilled continuously
+Limit = namedtuple("Limit", "burst period")
+
+DEFAULT_LIMITS = {
+    (CHEAP, "user"): Limit(20, 10.0),
+    (CHEAP, "guild"): Limit(100, 10.0),
+    (EXPENSIVE, "user"): Limit(5, 10.0),
+    (EXPENSIVE, "guild"): Limit(20, 10.0),
+}
+
+def parse_limit(text):
+    # "5/10" means 5 commands per 10 seconds
+    burst, period = text.split("/", 1)
+    limit = Limit(int(burst), float(period))
+    if limit.burst < 1 or limit.period <= 0:
+        raise ValueError(text)
+    return limit
+
+def limits_from_overrides(overrides):
+    # {"expensive_user": "5/10", "cheap_guild": "100/10", ...} from Config.limits
+    limits = dict(DEFAULT_LIMITS)
+    for budget, scope in DEFAULT_LIMITS:
+        key = f"{budget}_{scope}"
+        if overrides.get(key):
+            try:
+                limits[(budget, scope)] = parse_limit(overrides[key])
+            except ValueError:
+                print(f"Ignoring limit {key}={overrides[key]}, expected <count>/<seconds>")
+    return limits
+
+class Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+class RateLimiter:
+    # Token buckets per (budget, guild) and per (budget, guild, user); a
+    # command must fit in both. A bucket that has sat idle long enough to
+    # refill is identical to a fresh one, so idle buckets are dropped from
+    # the least recently used end on every check and memory stays bounded.
+    def __init__(self, limits=None, max_buckets=10000):
+        self.limits = limits or dict(DEFAULT_LIMITS)
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _bucket(self, key, limit, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(float(limit.burst), now)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(limit.burst, bucket.tokens + (now - bucket.updated) * limit.burst / limit.period)
+            bucket.updated = now
+        return bucket
+
+    def _evict(self, now):
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            limit = self.limits[(key[0], "user" if len(key) == 3 else "guild")]
+            if len(self._buckets) <= self.max_buckets and now - bucket.updated < limit.period:
+                break
+            del self._buckets[key]
+
+    def check(self, budget, guild_id, user_id, cost=1):
+        # Returns 0 when allowed, otherwise the seconds until it would be
+        now = time.monotonic()
+        self._evict(now)
+        user_limit = self.limits[(budget, "user")]
+        guild_limit = self.limits[(budget, "guild")]
+        buckets = (
+            (self._bucket((budget, guild_id, user_id), user_limit, now), user_limit),
+            (self._bucket((budget, guild_id), guild_limit, now), guild_limit),
+        )
+        retry_after = max((cost - bucket.tokens) * limit.period / limit.burst for bucket, limit in buckets)
+        if retry_after > 0:
+            return retry_after
+        for bucket, _ in buckets:
+            bucket.tokens -= cost
+        return 0.0
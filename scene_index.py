@@ -0,0 +1,210 @@
+import bisect
+import heapq
+import unicodedata
+from collections import Counter, OrderedDict
+
+# Match tiers, best first. Recent usage only reorders results inside a tier.
+TIER_EXACT = 5
+TIER_PREFIX = 4
+TIER_WORD = 3
+TIER_SUBSTRING = 2
+TIER_FUZZY = 1
+
+FUZZY_MIN_QUERY = 4
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_MAX_POSTING = 64
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+def word_starts(norm):
+    return [i for i, c in enumerate(norm) if c.isalnum() and (i == 0 or not norm[i - 1].isalnum())]
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SceneIndex:
+    # Autocomplete index over a SceneModel. Rebuilt lazily whenever the model's
+    # version changes, which also drops the per-query result cache.
+    def __init__(self, model, limit=25, cache_size=256, recent_size=10, max_users=1000):
+        self.model = model
+        self.limit = limit
+        self.cache_size = cache_size
+        self.recent_size = recent_size
+        self.max_users = max_users
+        self._version = None
+        self._names = []
+        self._norms = []
+        self._positions = {}
+        self._order = []
+        self._prefixes = []
+        self._words = []
+        self._grams = {}
+        self._cache = OrderedDict()
+        self._recent = OrderedDict()
+
+    def _rebuild(self):
+        names = list(self.model.names)
+        norms = [normalize(n) for n in names]
+        grams = {}
+        words = []
+        for idx, norm in enumerate(norms):
+            for n in (1, 2, 3):
+                for gram in {norm[i:i + n] for i in range(len(norm) - n + 1)}:
+                    grams.setdefault(gram, []).append(idx)
+            for pos in word_starts(norm)[1:]:
+                words.append((norm[pos:], idx))
+
+        self._names = names
+        self._norms = norms
+        self._positions = {name: idx for idx, name in enumerate(names)}
+        self._order = [0] * len(names)
+        for rank, idx in enumerate(sorted(range(len(names)), key=lambda i: (len(norms[i]), i))):
+            self._order[idx] = rank
+        self._prefixes = sorted((norm, idx) for idx, norm in enumerate(norms))
+        self._words = sorted(words)
+        self._grams = grams
+        self._cache.clear()
+        self._version = self.model.version
+
+    def _prefix_matches(self, entries, query, seen, count):
+        # entries is sorted, so prefix matches form one run in lexical order
+        matches = []
+        pos = bisect.bisect_left(entries, (query,))
+        while pos < len(entries) and len(matches) < count:
+            text, idx = entries[pos]
+            if not text.startswith(query):
+                break
+            if idx not in seen:
+                seen.add(idx)
+                matches.append(idx)
+            pos += 1
+        return matches
+
+    def _substring_candidates(self, query):
+        if len(query) <= 3:
+            return self._grams.get(query, [])
+        postings = [self._grams.get(g) for g in trigrams(query)]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        common = set(postings[0])
+        for posting in postings[1:]:
+            common.intersection_update(posting)
+            if not common:
+                return []
+        return [idx for idx in common if query in self._norms[idx]]
+
+    def _fuzzy_candidates(self, query):
+        # Trigrams shared by a large share of the names say little about a
+        # typo and dominate the cost, so only the selective ones are counted.
+        cap = max(FUZZY_MAX_POSTING, len(self._names) // 20)
+        postings = [p for p in (self._grams.get(g, ()) for g in trigrams(query)) if len(p) <= cap]
+        if not postings:
+            return {}
+        hits = Counter()
+        for posting in postings:
+            hits.update(posting)
+        needed = len(postings) * FUZZY_MIN_SIMILARITY
+        return {idx: count / len(postings) for idx, count in hits.items() if count >= needed}
+
+    def _rank(self, query):
+        # Walk the tiers best-first and stop as soon as the limit is filled,
+        # so short queries never score the whole list. Prefix and word-start
+        # matches come out of the sorted indexes alphabetically.
+        order = self._order.__getitem__
+        seen = set()
+        ranked = []
+
+        def take(tier, indices):
+            fresh = set(indices).difference(seen)
+            seen.update(fresh)
+            best = heapq.nsmallest(self.limit - len(ranked), fresh, key=order)
+            ranked.extend((tier, 0.0, idx) for idx in best)
+            return len(ranked) >= self.limit
+
+        def take_prefixed(tier, entries):
+            matches = self._prefix_matches(entries, query, seen, self.limit - len(ranked))
+            ranked.extend((tier, 0.0, idx) for idx in matches)
+            return len(ranked) >= self.limit
+
+        pos = bisect.bisect_left(self._prefixes, (query,))
+        exact = []
+        while pos < len(self._prefixes) and self._prefixes[pos][0] == query:
+            exact.append(self._prefixes[pos][1])
+            pos += 1
+
+        if (take(TIER_EXACT, exact)
+                or take_prefixed(TIER_PREFIX, self._prefixes)
+                or take_prefixed(TIER_WORD, self._words)
+                or take(TIER_SUBSTRING, self._substring_candidates(query))
+                or len(query) < FUZZY_MIN_QUERY):
+            return ranked
+
+        fuzzy = self._fuzzy_candidates(query)
+        fresh = set(fuzzy).difference(seen)
+        best = heapq.nsmallest(self.limit - len(ranked), fresh, key=lambda idx: (-fuzzy[idx], order(idx)))
+        ranked.extend((TIER_FUZZY, fuzzy[idx], idx) for idx in best)
+        return ranked
+
+    def _score(self, query, idx):
+        norm = self._norms[idx]
+        if norm == query:
+            return TIER_EXACT, 0.0
+        if norm.startswith(query):
+            return TIER_PREFIX, 0.0
+        if any(norm.startswith(query, pos) for pos in word_starts(norm)):
+            return TIER_WORD, 0.0
+        if query in norm:
+            return TIER_SUBSTRING, 0.0
+        if len(query) >= FUZZY_MIN_QUERY:
+            query_grams = trigrams(query)
+            similarity = len(query_grams & trigrams(norm)) / len(query_grams)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                return TIER_FUZZY, similarity
+        return None
+
+    def search(self, query, user_id=None):
+        if self._version != self.model.version:
+            self._rebuild()
+
+        query = normalize(query)
+        recent = self._recent.get(user_id, []) if user_id is not None else []
+        recent = [self._positions[name] for name in recent if name in self._positions]
+
+        if not query:
+            picked = recent + [idx for idx in range(min(len(self._names), self.limit + len(recent))) if idx not in recent]
+            return [self._names[idx] for idx in picked[:self.limit]]
+
+        ranked = self._cache.get(query)
+        if ranked is None:
+            ranked = self._rank(query)
+            self._cache[query] = ranked
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(query)
+
+        if not recent:
+            return [self._names[idx] for _, _, idx in ranked]
+
+        boost = {idx: len(recent) - rank for rank, idx in enumerate(recent)}
+        merged = {idx: (tier, quality) for tier, quality, idx in ranked}
+        for idx in recent:
+            if idx not in merged:
+                score = self._score(query, idx)
+                if score:
+                    merged[idx] = score
+
+        order = self._order
+        ordered = sorted(merged, key=lambda idx: (-merged[idx][0], -boost.get(idx, 0), -merged[idx][1], order[idx]))
+        return [self._names[idx] for idx in ordered[:self.limit]]
+
+    def record_use(self, user_id, scene):
+        history = self._recent.pop(user_id, [])
+        history = [scene] + [name for name in history if name != scene]
+        self._recent[user_id] = history[:self.recent_size]
+        if len(self._recent) > self.max_users:
+            self._recent.popitem(last=False)
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+import pytest
+
+class PlainSecrets:
+    # SecretManager stand-in that stores files as they are
+    def decrypt_content(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def encrypt_file(self, path):
+        pass
+
+class BrokenSecrets(PlainSecrets):
+    # What SecretManager does when the hardware-bound key no longer matches
+    def decrypt_content(self, path):
+        return ""
+
+@pytest.fixture
+def run():
+    return asyncio.run
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,115 @@
+import asyncio
+import gzip
+import json
+import os
+
+from audit import AuditLog, INDEX_FILE, segment_name
+
+def record(ts, guild=1, user=1, command="switch"):
+    return {"ts": ts, "guild": guild, "user": user, "name": f"User {user}", "command": command,
+            "args": {}, "outcome": "ok", "ok": True, "ms": 1.0}
+
+async def write_all(log, records):
+    log.start()
+    for r in records:
+        log.record(r)
+    await log.close()
+
+def test_history_is_newest_first_and_paged(tmp_path, run):
+    async def main():
+        log = AuditLog(str(tmp_path), flush_delay=0)
+        await write_all(log, [record(ts) for ts in range(25)])
+        first = await log.history(1, limit=10)
+        third = await log.history(1, offset=20, limit=10)
+        return log, first, third
+
+    log, first, third = run(main())
+    assert [r["ts"] for r in first] == list(range(24, 14, -1))
+    assert [r["ts"] for r in third] == [4, 3, 2, 1, 0]
+    assert log.count(1) == 25
+
+def test_history_filters_by_guild_and_user(tmp_path, run):
+    async def main():
+        log = AuditLog(str(tmp_path), flush_delay=0)
+        await write_all(log, [record(ts, guild=ts % 2, user=ts % 3) for ts in range(30)])
+        return log, await log.history(0, user_id=1, limit=100)
+
+    log, page = run(main())
+    assert page and all(r["guild"] == 0 and r["user"] == 1 for r in page)
+    assert log.count(0, 1) == len(page)
+
+def test_full_segments_are_gzipped_indexed_and_expired(tmp_path, run):
+    async def main():
+        log = AuditLog(str(tmp_path), segment_bytes=2000, keep_segments=3, flush_delay=0)
+        log.start()
+        for ts in range(200):
+            log.record(record(ts))
+            if ts % 10 == 9:
+                # One batch per ten records
+                await asyncio.sleep(0.01)
+        await log.close()
+        return log, await log.history(1, limit=1000)
+
+    log, page = run(main())
+    names = sorted(os.listdir(tmp_path))
+    sealed = [name for name in names if name.endswith(".gz")]
+    assert len(sealed) == 3
+    with open(tmp_path / INDEX_FILE, encoding="utf-8") as f:
+        index = json.load(f)
+    assert [s["number"] for s in index["segments"]] == [s.number for s in log.segments]
+    # Expired segments are gone from history and counts alike
+    assert len(page) == log.count(1) < 200
+    assert [r["ts"] for r in page] == sorted((r["ts"] for r in page), reverse=True)
+    assert page[0]["ts"] == 199
+
+def test_reload_continues_the_open_segment(tmp_path, run):
+    async def main():
+        await write_all(AuditLog(str(tmp_path), flush_delay=0), [record(ts) for ts in range(5)])
+        log = AuditLog(str(tmp_path), flush_delay=0)
+        await write_all(log, [record(ts) for ts in range(5, 8)])
+        return log, await log.history(1, limit=100)
+
+    log, page = run(main())
+    assert [r["ts"] for r in page] == [7, 6, 5, 4, 3, 2, 1, 0]
+    assert log.writes == 1
+
+def test_recovers_from_a_crash_mid_rotation_and_a_cut_line(tmp_path, run):
+    plain = tmp_path / segment_name(1)
+    lines = "".join(json.dumps(record(ts)) + "\n" for ts in range(3))
+    # Crashed after compressing segment 1 but before removing it...
+    with gzip.open(str(plain) + ".gz", "wt", encoding="utf-8") as f:
+        f.write(lines)
+    plain.write_text(lines, encoding="utf-8")
+    # ...with segment 2 cut short mid-line and index.json never written
+    (tmp_path / segment_name(2)).write_text(json.dumps(record(3)) + "\n" + '{"ts": 4, "gu', encoding="utf-8")
+
+    async def main():
+        log = AuditLog(str(tmp_path), flush_delay=0)
+        await write_all(log, [record(5)])
+        return log, await log.history(1, limit=100)
+
+    log, page = run(main())
+    assert not plain.exists()
+    assert [s.number for s in log.segments] == [1]
+    assert (tmp_path / INDEX_FILE).exists()
+    assert [r["ts"] for r in page] == [5, 3, 2, 1, 0]
+
+def test_unserializable_record_is_dropped_and_the_writer_keeps_going(tmp_path, run, capsys):
+    async def main():
+        log = AuditLog(str(tmp_path), flush_delay=0)
+        log.start()
+        bad = record(0)
+        bad["args"] = {"member": object()}
+        log.record(bad)
+        log.record(record(1))
+        await asyncio.sleep(0.05)
+        log.record(record(2))
+        await asyncio.sleep(0.05)
+        alive = not log._task.done()
+        await log.close()
+        return alive, await log.history(1, limit=100)
+
+    alive, page = run(main())
+    assert alive
+    assert [r["ts"] for r in page] == [2, 1]
+    assert "Dropping audit record" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from config import Config, CONFIG_VERSION, load_config, save_config, parse_shard_ids
+from conftest import PlainSecrets, BrokenSecrets
+
+LEGACY_ENV = "DISCORD_TOKEN=token\nOBS_PASSWORD=secret\nMODERATORS=1:Alice, the Great,2:Bob: Jr\n"
+
+def test_legacy_moderator_names_keep_commas_and_colons():
+    config = Config.from_legacy({"MODERATORS": "1:Alice, the Great,2:Bob: Jr"})
+    assert config.legacy_moderators == {"1": "Alice, the Great", "2": "Bob: Jr"}
+
+def test_legacy_env_is_migrated_and_removed(workdir):
+    (workdir / ".env").write_text(LEGACY_ENV, encoding="utf-8")
+    config = load_config(PlainSecrets(), environ={})
+    assert (config.discord_token, config.obs_password) == ("token", "secret")
+    assert not (workdir / ".env").exists()
+    stored = json.loads((workdir / ".streamcast").read_text(encoding="utf-8"))
+    assert stored["version"] == CONFIG_VERSION
+    assert stored["discord"]["token"] == "token"
+
+def test_undecryptable_legacy_env_is_kept(workdir):
+    (workdir / ".env").write_text("ciphertext", encoding="utf-8")
+    config = load_config(BrokenSecrets(), environ={})
+    assert config.discord_token == ""
+    assert (workdir / ".env").read_text(encoding="utf-8") == "ciphertext"
+    assert not (workdir / ".streamcast").exists()
+
+def test_environment_overrides_are_not_saved(workdir):
+    save_config(Config("stored-token", "pw"), PlainSecrets())
+    config = load_config(PlainSecrets(), environ={"DISCORD_TOKEN": "env-token", "STREAMCAST_LIMIT_EXPENSIVE_USER": "1/5"})
+    assert config.discord_token == "env-token"
+    assert config.limits == {"expensive_user": "1/5"}
+    config.update(obs_password="new")
+    save_config(config, PlainSecrets())
+    stored = load_config(PlainSecrets(), environ={})
+    assert (stored.discord_token, stored.obs_password, stored.limits) == ("stored-token", "new", {})
+
+def test_round_trip():
+    config = Config("token", "pw", "10.0.0.2", 4460)
+    config.sync_guilds = [5, 6]
+    config.shard_ids = [0, 2]
+    config.stats_interval = 0.5
+    config.trace_path = "traces/%Y.jsonl.gz"
+    restored = Config.from_dict(json.loads(json.dumps(config.to_dict())))
+    assert restored.to_dict() == config.to_dict()
+
+def test_newer_config_version_is_rejected():
+    with pytest.raises(ValueError):
+        Config.from_dict({"version": CONFIG_VERSION + 1})
+
+@pytest.mark.parametrize("value, expected", [("0", 0.0), ("2.5", 2.5), ("-1", 1.0), ("soon", 1.0)])
+def test_stats_interval_override(value, expected):
+    config = Config()
+    config.apply_environ({"STREAMCAST_STATS_INTERVAL": value})
+    assert config.stats_interval == expected
+
+def test_parse_shard_ids():
+    assert parse_shard_ids("0-2, 5") == [0, 1, 2, 5]
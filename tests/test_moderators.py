@@ -0,0 +1,91 @@
+import json
+from types import SimpleNamespace
+
+from moderators import ModeratorStore, GLOBAL_SCOPE
+from conftest import BrokenSecrets
+
+def member(user_id, *roles):
+    return SimpleNamespace(id=user_id, roles=[SimpleNamespace(id=role) for role in roles])
+
+def stored(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_grants_are_per_guild(workdir, run):
+    async def main():
+        store = ModeratorStore(".moderators", flush_delay=0)
+        store.load()
+        store.add_user(1, 10, "Alice")
+        store.add_role(1, 500, "Mods")
+        await store.close()
+        return store
+
+    store = run(main())
+    assert store.is_moderator(1, member(10))
+    assert store.is_moderator(1, member(11, 500))
+    assert not store.is_moderator(2, member(10))
+    assert not store.is_moderator(2, member(11, 500))
+    assert stored(".moderators")["guilds"] == {"1": {"users": {"10": "Alice"}, "roles": {"500": "Mods"}}}
+
+def test_writes_are_coalesced(workdir, run):
+    async def main():
+        store = ModeratorStore(".moderators", flush_delay=0.01)
+        store.load()
+        for user_id in range(20):
+            store.add_user(1, user_id, f"User {user_id}")
+        await store.close()
+        return store
+
+    store = run(main())
+    assert store.writes == 1
+    assert len(stored(".moderators")["guilds"]["1"]["users"]) == 20
+
+def test_legacy_grants_are_adopted_per_guild(workdir, run):
+    async def main():
+        store = ModeratorStore(".moderators", flush_delay=0)
+        store.load(legacy={"10": "Alice"})
+        before = store.is_moderator(3, member(10))
+        removed_early = store.remove_user(1, 10)
+        store.adopt_legacy([1, 2])
+        removed = store.remove_user(1, 10)
+        await store.close()
+        return store, before, removed_early, removed
+
+    store, before, removed_early, removed = run(main())
+    # Until the bot knows its guilds, legacy grants still apply everywhere
+    assert before
+    # ...but one guild's /remmod never revokes them elsewhere
+    assert not removed_early and removed
+    assert not store.is_moderator(1, member(10))
+    assert store.is_moderator(2, member(10))
+    assert not store.is_moderator(3, member(10))
+    assert GLOBAL_SCOPE not in store.guilds
+    assert stored(".moderators")["guilds"] == {"2": {"users": {"10": "Alice"}}}
+
+def test_version_1_file_is_read_as_legacy_grants(workdir):
+    (workdir / ".moderators").write_text(json.dumps({"moderators": {"10": "Alice"}}), encoding="utf-8")
+    store = ModeratorStore(".moderators")
+    store.load()
+    assert store.acl(GLOBAL_SCOPE).users == {10: "Alice"}
+
+def test_complete_temp_file_is_recovered(workdir):
+    (workdir / ".moderators.tmp").write_text(json.dumps({"version": 2, "guilds": {"1": {"users": {"10": "Alice"}}}}),
+                                             encoding="utf-8")
+    store = ModeratorStore(".moderators")
+    store.load()
+    assert store.is_moderator(1, member(10))
+    assert not (workdir / ".moderators.tmp").exists()
+    assert stored(".moderators")["guilds"]["1"]["users"] == {"10": "Alice"}
+
+def test_unreadable_file_is_set_aside_not_overwritten(workdir, run):
+    (workdir / ".moderators").write_text("ciphertext", encoding="utf-8")
+
+    async def main():
+        store = ModeratorStore(".moderators", BrokenSecrets(), flush_delay=0)
+        store.load()
+        store.add_user(1, 10, "Alice")
+        await store.close()
+
+    run(main())
+    assert (workdir / ".moderators.bak").read_text(encoding="utf-8") == "ciphertext"
+    assert (workdir / ".moderators").exists()
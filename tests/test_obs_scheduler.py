@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from obs_scheduler import ObsScheduler, RAN, MERGED, SUPERSEDED
+
+class FakeSession:
+    def __init__(self, latency=0.01):
+        self.latency = latency
+        self.calls = []
+
+    async def request(self, request_type, data=None):
+        self.calls.append((request_type, data))
+        await asyncio.sleep(self.latency)
+        return {"requestType": request_type}
+
+def scenes(session):
+    return [data["sceneName"] for request_type, data in session.calls if request_type == "SetCurrentProgramScene"]
+
+def test_burst_of_switches_collapses_to_the_newest(run):
+    async def main():
+        session = FakeSession()
+        scheduler = ObsScheduler(session, window=0.05)
+        first = asyncio.ensure_future(scheduler.switch_scene("A"))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(scheduler.switch_scene(scene)) for scene in ("B", "C", "D")]
+        outcomes = await asyncio.gather(first, *rest)
+        await scheduler.close()
+        return session, outcomes
+
+    session, outcomes = run(main())
+    assert scenes(session) == ["A", "D"]
+    assert [outcome.status for outcome in outcomes] == [RAN, SUPERSEDED, SUPERSEDED, RAN]
+
+def test_repeated_switch_to_the_queued_scene_is_merged(run):
+    async def main():
+        session = FakeSession()
+        scheduler = ObsScheduler(session, window=0.05)
+        first = asyncio.ensure_future(scheduler.switch_scene("A"))
+        await asyncio.sleep(0)
+        queued = [asyncio.ensure_future(scheduler.switch_scene("B")) for _ in range(3)]
+        outcomes = await asyncio.gather(first, *queued)
+        await scheduler.close()
+        return session, outcomes
+
+    session, outcomes = run(main())
+    assert scenes(session) == ["A", "B"]
+    assert sorted(outcome.status for outcome in outcomes[1:]) == [MERGED, MERGED, RAN]
+
+def test_switch_back_while_another_is_queued_wins(run):
+    # A -> B (held by the window) -> A again must end on A
+    async def main():
+        session = FakeSession(latency=0)
+        scheduler = ObsScheduler(session, window=0.05)
+        await scheduler.switch_scene("A")
+        queued = asyncio.ensure_future(scheduler.switch_scene("B"))
+        await asyncio.sleep(0)
+        assert scheduler.switch_pending
+        back = await scheduler.switch_scene("A")
+        superseded = await queued
+        pending_after = scheduler.switch_pending
+        await scheduler.close()
+        return session, back, superseded, pending_after
+
+    session, back, superseded, pending_after = run(main())
+    assert scenes(session) == ["A", "A"]
+    assert back.status == RAN
+    assert superseded.status == SUPERSEDED
+    assert not pending_after
+
+def test_serialized_joins_a_running_operation(run):
+    async def main():
+        calls = []
+
+        async def start():
+            calls.append("start")
+            await asyncio.sleep(0.02)
+            return "started"
+
+        scheduler = ObsScheduler(FakeSession())
+        outcomes = await asyncio.gather(*(scheduler.serialized("start_stream", start) for _ in range(4)))
+        await scheduler.close()
+        return calls, outcomes
+
+    calls, outcomes = run(main())
+    assert calls == ["start"]
+    assert [outcome.status for outcome in outcomes] == [RAN, MERGED, MERGED, MERGED]
+    assert {outcome.result for outcome in outcomes} == {"started"}
+
+def test_different_operations_run_in_arrival_order(run):
+    async def main():
+        order = []
+
+        def action(name):
+            async def run_action():
+                order.append(name)
+            return run_action
+
+        scheduler = ObsScheduler(FakeSession())
+        await asyncio.gather(scheduler.serialized("stop", action("stop")), scheduler.serialized("start", action("start")))
+        await scheduler.close()
+        return order
+
+    assert run(main()) == ["stop", "start"]
+
+def test_failure_reaches_every_waiter(run):
+    async def main():
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("OBS said no")
+
+        scheduler = ObsScheduler(FakeSession())
+        results = await asyncio.gather(*(scheduler.serialized("macro:x", fail) for _ in range(2)), return_exceptions=True)
+        await scheduler.close()
+        return results
+
+    results = run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_close_cancels_queued_waiters(run):
+    async def main():
+        scheduler = ObsScheduler(FakeSession(latency=1.0), window=0.05)
+        running = asyncio.ensure_future(scheduler.switch_scene("A"))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(scheduler.switch_scene("B"))
+        await asyncio.sleep(0.01)
+        await scheduler.close()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        return scheduler.depth
+
+    assert run(main()) == 0
@@ -0,0 +1,47 @@
+import pytest
+
+from obs_stats import RingBuffer, StatsHistory, FIELD_KEYS
+
+def sample(value):
+    return {key: float(value) for key in FIELD_KEYS}
+
+def test_ring_buffer_overwrites_the_oldest_row():
+    ring = RingBuffer(3, ("x",))
+    for i in range(5):
+        ring.append(float(i), {"x": i * 10})
+    assert len(ring) == 3
+    assert [ring.data["x"][i] for i in ring.since(0)] == [40, 30, 20]
+    assert ring.times[ring.latest()] == 4.0
+
+def test_ring_buffer_since_stops_at_the_cutoff():
+    ring = RingBuffer(10, ("x",))
+    for i in range(5):
+        ring.append(float(i), {"x": i})
+    assert [ring.times[i] for i in ring.since(2.5)] == [4.0, 3.0]
+    assert RingBuffer(4, ("x",)).latest() is None
+
+def test_fine_window_summary():
+    history = StatsHistory(interval=1.0, fine_span=60)
+    for t, value in enumerate((10, 20, 30, 40)):
+        history.add(1000.0 + t, sample(value))
+    low, average, high = history.summary(2.5, now=1003.0)["fps"]
+    assert (low, average, high) == (20, 30, 40)
+    timestamp, current = history.current()
+    assert timestamp == 1003.0 and current["cpu"] == 40
+
+def test_coarse_window_includes_the_bucket_being_filled():
+    history = StatsHistory(interval=1.0, fine_span=10, coarse_step=60, coarse_span=3600)
+    for t in range(180):
+        history.add(60.0 * 100 + t, sample(t))
+    low, average, high = history.summary(600, now=60.0 * 100 + 179)["memory"]
+    assert low == 0 and high == 179
+    assert average == pytest.approx(89.5)
+
+def test_summary_without_samples():
+    history = StatsHistory()
+    assert history.summary(60, now=1000.0) is None
+    assert history.current() == (None, None)
+
+def test_sampling_off_does_not_divide_by_zero():
+    history = StatsHistory(interval=0)
+    assert history.fine.capacity == 1
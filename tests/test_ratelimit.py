@@ -0,0 +1,86 @@
+import pytest
+
+import ratelimit
+from ratelimit import RateLimiter, Limit, CHEAP, EXPENSIVE, DEFAULT_LIMITS, parse_limit, limits_from_overrides
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+def limiter(user=Limit(2, 10.0), guild=Limit(3, 10.0), **kwargs):
+    limits = dict(DEFAULT_LIMITS)
+    limits[(EXPENSIVE, "user")] = user
+    limits[(EXPENSIVE, "guild")] = guild
+    return RateLimiter(limits, **kwargs)
+
+def test_user_burst_then_retry_after(clock):
+    limits = limiter()
+    assert limits.check(EXPENSIVE, 1, 10) == 0
+    assert limits.check(EXPENSIVE, 1, 10) == 0
+    assert limits.check(EXPENSIVE, 1, 10) == pytest.approx(5.0)
+
+def test_tokens_refill_continuously(clock):
+    limits = limiter()
+    limits.check(EXPENSIVE, 1, 10)
+    limits.check(EXPENSIVE, 1, 10)
+    clock.now += 5.0
+    assert limits.check(EXPENSIVE, 1, 10) == 0
+    assert limits.check(EXPENSIVE, 1, 10) > 0
+
+def test_guild_budget_is_shared_by_its_members(clock):
+    limits = limiter()
+    assert [limits.check(EXPENSIVE, 1, user) for user in (10, 11, 12)] == [0, 0, 0]
+    assert limits.check(EXPENSIVE, 1, 13) > 0
+    # Another guild has its own budget
+    assert limits.check(EXPENSIVE, 2, 13) == 0
+
+def test_rejected_command_costs_nothing(clock):
+    limits = limiter(guild=Limit(100, 10.0))
+    limits.check(EXPENSIVE, 1, 10)
+    limits.check(EXPENSIVE, 1, 10)
+    for _ in range(5):
+        assert limits.check(EXPENSIVE, 1, 10) > 0
+    clock.now += 5.0
+    assert limits.check(EXPENSIVE, 1, 10) == 0
+
+def test_budgets_are_independent(clock):
+    limits = limiter()
+    limits.check(EXPENSIVE, 1, 10)
+    limits.check(EXPENSIVE, 1, 10)
+    assert limits.check(CHEAP, 1, 10) == 0
+
+def test_idle_buckets_are_evicted(clock):
+    limits = limiter()
+    for user in range(50):
+        limits.check(EXPENSIVE, 1, user)
+    assert len(limits) == 51
+    clock.now += 10.0
+    limits.check(EXPENSIVE, 2, 1)
+    assert len(limits) == 2
+
+def test_bucket_count_stays_bounded(clock):
+    limits = limiter(guild=Limit(10 ** 6, 10.0), max_buckets=100)
+    for user in range(1000):
+        clock.now += 0.001
+        limits.check(EXPENSIVE, 1, user)
+    assert len(limits) <= 101
+
+def test_parse_limit():
+    assert parse_limit("5/10") == Limit(5, 10.0)
+    for text in ("0/10", "5/0", "five/10", "5"):
+        with pytest.raises(ValueError):
+            parse_limit(text)
+
+def test_overrides_replace_defaults_and_skip_invalid_values():
+    limits = limits_from_overrides({"expensive_user": "1/2", "cheap_guild": "nonsense"})
+    assert limits[(EXPENSIVE, "user")] == Limit(1, 2.0)
+    assert limits[(CHEAP, "guild")] == DEFAULT_LIMITS[(CHEAP, "guild")]
@@ -0,0 +1,50 @@
+from scene_index import SceneIndex, normalize
+
+class Model:
+    def __init__(self, names):
+        self.names = names
+        self.version = 1
+
+    def set(self, names):
+        self.names = names
+        self.version += 1
+
+SCENES = ["Gameplay", "Game Over", "Main Camera", "Be Right Back", "Endgame Credits", "Intro"]
+
+def test_tiers_rank_exact_prefix_word_substring_then_fuzzy():
+    index = SceneIndex(Model(SCENES + ["Game"]))
+    # Prefix matches come out alphabetically; "camera" shares half of the trigrams
+    assert index.search("game") == ["Game", "Game Over", "Gameplay", "Endgame Credits", "Main Camera"]
+    assert index.search("camera") == ["Main Camera"]
+    assert index.search("right") == ["Be Right Back"]
+    assert index.search("gmeplay") == ["Gameplay"]
+
+def test_empty_query_lists_scenes_with_recent_first():
+    index = SceneIndex(Model(SCENES))
+    index.record_use(7, "Intro")
+    assert index.search("", 7)[:2] == ["Intro", "Gameplay"]
+    assert index.search("") == SCENES
+
+def test_recent_use_reorders_within_a_tier_only():
+    index = SceneIndex(Model(SCENES))
+    index.record_use(7, "Main Camera")
+    index.record_use(7, "Gameplay")
+    assert index.search("game", 7) == ["Gameplay", "Game Over", "Endgame Credits", "Main Camera"]
+    # Other users keep the plain ranking
+    assert index.search("game", 8) == ["Game Over", "Gameplay", "Endgame Credits", "Main Camera"]
+
+def test_model_changes_rebuild_the_index():
+    model = Model(SCENES)
+    index = SceneIndex(model)
+    assert index.search("outro") == []
+    model.set(SCENES + ["Outro"])
+    assert index.search("outro") == ["Outro"]
+
+def test_accents_and_case_are_ignored():
+    index = SceneIndex(Model(["Café Chat", "CAFE"]))
+    assert normalize("  Café   CHAT ") == "cafe chat"
+    assert index.search("cafe") == ["CAFE", "Café Chat"]
+
+def test_results_are_capped():
+    index = SceneIndex(Model([f"Scene {i}" for i in range(100)]), limit=25)
+    assert len(index.search("scene")) == 25
@@ -0,0 +1,61 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+from trace_recorder import TraceRecorder, read_runs, read_trace, COMMAND, OWNER, MODERATOR, MEMBER
+from replay import schedule
+
+class Moderators:
+    def __init__(self, *user_ids):
+        self.user_ids = set(user_ids)
+
+    def is_moderator(self, guild_id, member):
+        return member.id in self.user_ids
+
+def interaction(user_id, guild_id=900, owner_id=1):
+    return SimpleNamespace(user=SimpleNamespace(id=user_id), guild=SimpleNamespace(id=guild_id, owner_id=owner_id),
+                           guild_id=guild_id)
+
+def record_run(path, run, commands, moderators=Moderators()):
+    async def main():
+        recorder = TraceRecorder(str(path), moderators)
+        for user_id, name in commands:
+            recorder._record(COMMAND, interaction(user_id), name, a={})
+        await recorder.close()
+    run(main())
+
+def test_ids_become_aliases_and_roles_are_noted(tmp_path, run):
+    path = tmp_path / "trace.jsonl.gz"
+    record_run(path, run, [(1, "switch"), (123456789, "switch"), (555, "preview"), (123456789, "toggle")],
+               Moderators(123456789))
+    events = read_trace(str(path))
+    assert [(e["u"], e["g"], e["r"]) for e in events] == [(1, 1, OWNER), (2, 1, MODERATOR), (3, 1, MEMBER), (2, 1, MODERATOR)]
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "123456789" not in f.read()
+
+def test_each_restart_is_a_separate_run(tmp_path, run):
+    path = tmp_path / "trace.jsonl.gz"
+    record_run(path, run, [(1, "switch"), (2, "preview")])
+    record_run(path, run, [(3, "macro")])
+    runs = read_runs(str(path))
+    assert [[e["n"] for e in events] for events in runs] == [["switch", "preview"], ["macro"]]
+    # Aliases start over with each run
+    assert runs[1][0]["u"] == 1
+    assert [e["n"] for e in read_trace(str(path))] == ["macro"]
+    assert [e["n"] for e in read_trace(str(path), 0)] == ["switch", "preview"]
+
+def test_runs_are_sorted_and_skip_damaged_lines(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"v": 1, "started": 0}) + "\n")
+        f.write(json.dumps({"t": 2.0, "k": COMMAND, "n": "b"}) + "\n")
+        f.write('{"t": 1.5, "k"\n')
+        f.write(json.dumps({"t": 1.0, "k": COMMAND, "n": "a"}) + "\n")
+    assert [e["n"] for e in read_trace(str(path))] == ["a", "b"]
+
+def test_replay_starts_at_the_first_event():
+    events = [{"t": 1.02}, {"t": 1.07}, {"t": 1.12}]
+    offsets = schedule(events, 10)
+    assert offsets[0] == 0
+    assert offsets[-1] == (1.12 - 1.02) / 10
+    assert schedule(events, 0) == [None, None, None]
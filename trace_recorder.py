@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import gzip
+import json
+import time
+
+from discord import app_commands
+
+TRACE_VERSION = 1
+
+# Event kinds
+COMMAND = "c"
+AUTOCOMPLETE = "a"
+
+# What the invoking user was allowed to do when the event arrived
+OWNER = "o"
+MODERATOR = "m"
+MEMBER = "-"
+
+class TraceRecorder:
+    # Notes when every slash command and autocomplete request arrived, from
+    # whom and with which options, so bench/replay.py can re-drive the same
+    # traffic shape offline. Users, guilds and roles are replaced by small
+    # aliases in order of appearance, which keeps the trace compact and free
+    # of real ids. Events are buffered in memory and appended to the gzip
+    # file from a worker thread every `flush_interval` seconds.
+    def __init__(self, path, moderators, flush_interval=2.0):
+        self.path = path
+        self.moderators = moderators
+        self.flush_interval = flush_interval
+        self.started = time.monotonic()
+        self.events = 0
+        self._buffer = []
+        self._users = {}
+        self._guilds = {}
+        self._roles = {}
+        self._header = True
+        self._task = None
+
+    def _alias(self, table, key):
+        alias = table.get(key)
+        if alias is None:
+            alias = table[key] = len(table) + 1
+        return alias
+
+    def _value(self, value):
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if hasattr(value, "display_name"):
+            return {"member": self._alias(self._users, value.id)}
+        if hasattr(value, "id"):
+            return {"role": self._alias(self._roles, value.id)}
+        return str(value)
+
+    def _role(self, interaction):
+        if interaction.user.id == interaction.guild.owner_id:
+            return OWNER
+        if self.moderators.is_moderator(interaction.guild.id, interaction.user):
+            return MODERATOR
+        return MEMBER
+
+    def _record(self, kind, interaction, name, **fields):
+        event = {
+            "t": round(time.monotonic() - self.started, 4),
+            "k": kind,
+            "n": name,
+            "u": self._alias(self._users, interaction.user.id),
+            "g": self._alias(self._guilds, interaction.guild_id),
+            "r": self._role(interaction),
+        }
+        event.update(fields)
+        self._buffer.append(event)
+        self.events += 1
+
+    def _wrap_command(self, name, callback):
+        @functools.wraps(callback)
+        async def recorded(interaction, **params):
+            self._record(COMMAND, interaction, name, a={key: self._value(value) for key, value in params.items()})
+            return await callback(interaction, **params)
+        return recorded
+
+    def _wrap_autocomplete(self, name, param, callback):
+        @functools.wraps(callback)
+        async def recorded(interaction, current):
+            options = {key: self._value(value) for key, value in vars(interaction.namespace).items() if key != param}
+            self._record(AUTOCOMPLETE, interaction, name, p=param, v=current, a=options)
+            return await callback(interaction, current)
+        return recorded
+
+    def instrument(self, tree):
+        # Wraps the handlers already registered on the tree; call after register_commands
+        for command in tree.walk_commands():
+            if not isinstance(command, app_commands.Command):
+                continue
+            command._callback = self._wrap_command(command.name, command._callback)
+            for param in command._params.values():
+                if param.autocomplete is not None:
+                    param.autocomplete = self._wrap_autocomplete(command.name, param.name, param.autocomplete)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _write(self, events):
+        # Each flush appends one gzip member; readers see a single stream
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            if self._header:
+                f.write(json.dumps({"v": TRACE_VERSION, "started": time.time() - (time.monotonic() - self.started)}) + "\n")
+                self._header = False
+            f.writelines(json.dumps(event, separators=(",", ":")) + "\n" for event in events)
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        events, self._buffer = self._buffer, []
+        write = asyncio.get_running_loop().run_in_executor(None, self._write, events)
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            await write
+            raise
+        except OSError as e:
+            print(f"Could not write trace {self.path}: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+def read_runs(path):
+    # [[event dict]] per recording session, each in arrival order. A restart
+    # appends a new header, and times and aliases start over after it.
+    runs = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if "k" not in event:
+                runs.append([])
+            elif runs:
+                runs[-1].append(event)
+    for events in runs:
+        events.sort(key=lambda event: event["t"])
+    return [events for events in runs if events]
+
+def read_trace(path, run=-1):
+    # One run's events, the latest by default
+    runs = read_runs(path)
+    return runs[run] if runs else []
@@ -0,0 +1,45 @@
+import queue
+from collections import deque
+
+# Event kinds posted by the bot thread
+STATUS = "status"
+OBS = "obs"
+FEED = "feed"
+SHARDS = "shards"
+
+class UiBridge:
+    # One-way channel from the bot's event loop thread to the Tk thread.
+    # post() never blocks and may be called from any thread; the Tk side
+    # calls drain() from an after() tick and receives one coalesced update
+    # per batch: the latest status, the latest state per OBS instance, the
+    # latest shard report and the newest activity lines. A burst of events
+    # costs a single redraw.
+    def __init__(self, feed_size=50, batch_size=500):
+        self.feed_size = feed_size
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+
+    def post(self, kind, **data):
+        self._queue.put((kind, data))
+
+    def drain(self):
+        update = {}
+        feed = deque(maxlen=self.feed_size)
+        for _ in range(self.batch_size):
+            try:
+                kind, data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == FEED:
+                feed.append(data["text"])
+            elif kind == OBS:
+                update.setdefault(OBS, {})[data["instance"]] = data
+            elif kind == SHARDS:
+                update[SHARDS] = data["shards"]
+            elif kind == STATUS:
+                # Keep an identity from an earlier status in the same batch
+                identity = data.get("identity") or update.get(STATUS, {}).get("identity")
+                update[STATUS] = dict(data, identity=identity)
+        if feed:
+            update[FEED] = list(feed)
+        return update